@@ -0,0 +1,157 @@
+"""Admission control for the scoring endpoints: size limits, per-client rate limits and load shedding.
+
+Checks run cheapest first. The body size is checked from Content-Length before the body is
+read. The per-client token bucket is checked before parsing. The word limit is checked before
+any analysis. A slot under the concurrency limit is taken only for the scoring itself. Every
+rejection is counted by reason, so the limits can be tuned from /admission/stats or /metrics.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+REASONS = ("body_too_large", "too_many_words", "rate_limited", "overloaded")
+
+class PayloadTooLarge(ValueError):
+    """A request body, transcript or batch over its configured limit (HTTP 413)."""
+
+class TokenBucketLimiter:
+    """Per-client token buckets: rate_per_sec tokens per second, up to burst.
+
+    A request is admitted while its client's bucket holds min(cost, burst) tokens and is then
+    charged its full cost, so a large batch can leave the bucket in debt until it refills.
+    Buckets are kept for the max_clients most recently seen clients; a forgotten client starts
+    again with a full bucket. rate_per_sec <= 0 disables the limiter.
+    """
+
+    def __init__(self, rate_per_sec=0.0, burst=20, max_clients=10000):
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict() # client -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate_per_sec > 0
+
+    def acquire(self, client, cost=1):
+        """Charges client for a request; returns 0.0 if admitted, else the seconds until it would be."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        needed = min(cost, self.burst)
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [float(self.burst), now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_sec)
+                bucket[1] = now
+            if bucket[0] < needed:
+                return (needed - bucket[0]) / self.rate_per_sec
+            bucket[0] -= cost
+            return 0.0
+
+    def clients(self):
+        with self._lock:
+            return len(self._buckets)
+
+class ConcurrencyLimiter:
+    """Caps in-flight scoring at max_in_flight; a request waits up to wait_sec for a slot, then is shed.
+
+    max_in_flight <= 0 disables the limit (requests are still counted).
+    """
+
+    def __init__(self, max_in_flight=0, wait_sec=0.5):
+        self.max_in_flight = max_in_flight
+        self.wait_sec = wait_sec
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Takes a slot; returns False if none freed up within wait_sec."""
+        with self._condition:
+            if self.max_in_flight > 0 and not self._condition.wait_for(
+                    lambda: self.in_flight < self.max_in_flight, self.wait_sec):
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+class AdmissionControl:
+    """The configured limits for one app, with counters of admitted and rejected requests."""
+
+    def __init__(self, max_body_bytes=8 * 1024 * 1024, max_words=20000, rate_per_sec=0.0, burst=20,
+                 max_in_flight=0, wait_sec=0.5, retry_after_sec=1, max_job_words=0):
+        self.max_body_bytes = max_body_bytes
+        self.max_words = max_words
+        self.max_job_words = max_job_words # queued jobs are scored off the request thread, so may be longer
+        self.retry_after_sec = retry_after_sec
+        self.rate = TokenBucketLimiter(rate_per_sec, burst)
+        self.concurrency = ConcurrencyLimiter(max_in_flight, wait_sec)
+        self._lock = threading.Lock()
+        self.stats = {"admitted": 0, **{reason: 0 for reason in REASONS}}
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def check_body_size(self, content_length):
+        """Raises PayloadTooLarge if a declared Content-Length is over max_body_bytes."""
+        if self.max_body_bytes > 0 and content_length is not None and content_length > self.max_body_bytes:
+            self.count("body_too_large")
+            raise PayloadTooLarge(f"Request body too large: {content_length} bytes (maximum {self.max_body_bytes}).")
+
+    def body_too_large(self):
+        """The error for a body without Content-Length that ran past max_body_bytes while being read."""
+        self.count("body_too_large")
+        return PayloadTooLarge(f"Request body too large (maximum {self.max_body_bytes} bytes).")
+
+    def check_words(self, transcript, max_words=None):
+        """Raises PayloadTooLarge if transcript has more than max_words (default self.max_words) whitespace-separated words."""
+        max_words = self.max_words if max_words is None else max_words
+        if max_words <= 0 or len(transcript) <= max_words:
+            return
+        self.check_word_count(len(transcript.split()), max_words)
+
+    def check_word_count(self, words, max_words=None):
+        """Raises PayloadTooLarge if words (e.g. the length of an ASR word list) is over max_words (default self.max_words)."""
+        max_words = self.max_words if max_words is None else max_words
+        if 0 < max_words < words:
+            self.count("too_many_words")
+            raise PayloadTooLarge(f"Transcript too long: {words} words (maximum {max_words}).")
+
+    def check_rate(self, client, cost=1):
+        """Returns None if client is within its rate limit, else the whole seconds to wait before retrying."""
+        wait = self.rate.acquire(client, cost)
+        if not wait:
+            return None
+        self.count("rate_limited")
+        return max(1, math.ceil(wait))
+
+    def enter(self):
+        """Takes a scoring slot; returns False (and counts the request as shed) when at capacity."""
+        if not self.concurrency.acquire():
+            self.count("overloaded")
+            return False
+        self.count("admitted")
+        return True
+
+    def leave(self):
+        self.concurrency.release()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        return dict(stats, in_flight=self.concurrency.in_flight, peak_in_flight=self.concurrency.peak_in_flight,
+                    max_in_flight=self.concurrency.max_in_flight, tracked_clients=self.rate.clients())
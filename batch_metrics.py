@@ -0,0 +1,161 @@
+"""NumPy batch engine for bulk scoring.
+
+Text work (tokenizing, phrase scanning) is still done per transcript, but everything after it
+runs as array operations over the whole batch: WPM, TTR, filler rate, grammar score, bucket
+lookups (np.searchsorted on the COMPILED_RUBRIC boundaries), per-category and total scores.
+analyze_many() turns the arrays back into result dicts identical to analyze_transcript's.
+rescore() runs only the scoring half over raw metric fields stored earlier, optionally against
+a changed rubric, so rubric edits do not require re-analyzing the text. save_raw()/load_raw()
+store raw metrics as columns in an .npz file, which loads far faster than JSON.
+
+Requires numpy, which the web app itself does not need.
+"""
+import numpy as np
+
+from scoring import (COMPILED_RUBRIC, ENABLED_METRICS, KEYWORD_PHRASES, TranscriptContext, extract_raw_metrics,
+                     score_raw_metrics)
+
+_ARRAY_FIELDS = {
+    "word_count": np.int64, "duration_sec": np.float64, "type_count": np.int64, "filler_count": np.int64,
+    "has_salutation": np.int64, "has_flow": np.int64, "grammar_errors_per_100_words": np.float64,
+    "grammar_timed_out": np.bool_
+}
+
+def extract_raw_arrays(transcripts, durations):
+    """Extracts each transcript's raw metric fields (as analyze_transcript does), returning numeric ones as arrays.
+
+    Fields of disabled metrics are absent. "raw" keeps the per-transcript dicts, and
+    keyword_details and highlights stay Python lists, since they only feed the formatted result.
+    """
+    rows, highlights = [], []
+    for transcript, duration_sec in zip(transcripts, durations):
+        context = TranscriptContext(transcript, duration_sec)
+        rows.append(extract_raw_metrics(context))
+        highlights.append(context.phrase_scan["matches"] if "phrase_scan" in context.__dict__ else [])
+    arrays = raw_arrays(rows)
+    arrays["highlights"] = highlights
+    return arrays
+
+def raw_arrays(rows):
+    """Turns a list of raw metric dicts (from extract_raw_metrics) into the arrays score_arrays takes."""
+    arrays = {"raw": rows}
+    fields = rows[0].keys() if rows else ["word_count", "duration_sec"]
+    for field in fields:
+        if field in _ARRAY_FIELDS:
+            arrays[field] = np.array([row[field] for row in rows], dtype=_ARRAY_FIELDS[field])
+    if "keyword_details" in fields:
+        arrays["keyword_details"] = [row["keyword_details"] for row in rows]
+        arrays["found_keywords"] = np.array([sum(1 for found in row["keyword_details"].values() if found) for row in rows],
+                                            dtype=np.int64)
+    return arrays
+
+def raw_columns(rows):
+    """Packs raw metric dicts into the columns save_raw stores: the numeric fields and a keyword_found matrix.
+
+    keyword_found has one boolean column per KEYWORD_PHRASES label, in that order.
+    """
+    arrays = raw_arrays(rows)
+    columns = {field: arrays[field] for field in _ARRAY_FIELDS if field in arrays}
+    if "keyword_details" in arrays:
+        columns["keyword_found"] = np.array([[details[label] for label in KEYWORD_PHRASES] for details in arrays["keyword_details"]],
+                                            dtype=np.bool_).reshape(len(rows), len(KEYWORD_PHRASES))
+    return columns
+
+def save_raw(path, ids, columns, raw_version):
+    """Writes ids (stored as strings) and raw_columns() output to an .npz file, tagged with raw_version."""
+    np.savez(path, ids=np.array([str(record_id) for record_id in ids]), raw_version=np.array(raw_version), **columns)
+
+def load_raw(path):
+    """Reads a save_raw file; returns (ids, raw arrays for score_arrays, raw_version)."""
+    with np.load(path) as data:
+        arrays = {field: data[field] for field in data.files if field in _ARRAY_FIELDS}
+        if "keyword_found" in data.files:
+            arrays["found_keywords"] = data["keyword_found"].sum(axis=1, dtype=np.int64)
+        return data["ids"], arrays, str(data["raw_version"])
+
+def bucket_indices(compiled_buckets, values):
+    """Vectorized CompiledBuckets.lookup: index into compiled_buckets.results, or -1 for the fallback bucket."""
+    # An open lower end at x admits exactly the floats >= nextafter(x, inf)
+    lows = np.array([low if kind == 0 else np.nextafter(low, np.inf) for low, kind in compiled_buckets.lower_keys])
+    indices = np.searchsorted(lows, values, side="right") - 1
+    last = len(lows) - 1
+    if compiled_buckets.high_closed:
+        above = values > compiled_buckets.high
+    else:
+        above = values >= compiled_buckets.high
+    indices[(indices == last) & above] = -1
+    indices[np.isnan(values)] = -1
+    return indices
+
+def bucket_scores(compiled_buckets, indices):
+    """Maps bucket indices from bucket_indices to scores."""
+    scores = np.array([score for score, _ in compiled_buckets.results] + [compiled_buckets.fallback[0]])
+    return scores[indices] # -1 picks the fallback appended at the end
+
+def metric_values(raw):
+    """Vectorized values of the enabled ScoringBuckets metrics, keyed by metric name."""
+    word_count, duration = raw["word_count"], raw["duration_sec"]
+    enabled = {metric.name for metric in ENABLED_METRICS}
+    values = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "Speech rate (WPM)" in enabled:
+            values["Speech rate (WPM)"] = np.where(duration <= 0, 0.0, (word_count / duration) * 60)
+        if "Grammar errors (Score)" in enabled:
+            values["Grammar errors (Score)"] = 1 - np.minimum(raw["grammar_errors_per_100_words"] / 10, 1)
+        if "Vocabulary richness (TTR)" in enabled:
+            values["Vocabulary richness (TTR)"] = np.where(word_count == 0, 0.0, raw["type_count"] / word_count)
+        if "Filler Word Rate" in enabled:
+            values["Filler Word Rate"] = np.where(word_count > 0, (raw["filler_count"] / word_count) * 100, 100.0)
+    return values
+
+def score_arrays(raw, rubric=COMPILED_RUBRIC):
+    """Computes metric values, bucket indices and scores for a batch of raw arrays under a CompiledRubric.
+
+    scores has an array per enabled metric, including the rule-scored content metrics.
+    """
+    values = metric_values(raw)
+    indices = {name: bucket_indices(rubric.metrics[name], value) for name, value in values.items()}
+    scores = {name: bucket_scores(rubric.metrics[name], index) for name, index in indices.items()}
+
+    content = np.zeros(len(raw["word_count"]), dtype=np.int64)
+    for metric in ENABLED_METRICS:
+        spec = rubric.specs[metric.name]
+        if metric.name == "Key word Presence":
+            scores[metric.name] = np.floor(spec["Rules"][0]["MaxScore"] * (raw["found_keywords"] / len(spec["Keywords"]))).astype(np.int64)
+        elif metric.name == "Salutation Level":
+            scores[metric.name] = raw["has_salutation"] * spec["Rules"][0]["PassScore"]
+        elif metric.name == "Flow":
+            scores[metric.name] = raw["has_flow"] * spec["Rules"][0]["PassScore"]
+        else:
+            continue
+        content = content + scores[metric.name]
+    total = sum(scores.values(), np.zeros(len(raw["word_count"]), dtype=np.int64))
+    return {"values": values, "bucket_indices": indices, "scores": scores, "content_score": content, "total_score": total}
+
+def _results(raw, scored, rubric):
+    """Formats scored arrays into score_raw_metrics result dicts, one per row."""
+    bucket_lists = {
+        name: [rubric.metrics[name].results[i] if i >= 0 else rubric.metrics[name].fallback for i in index.tolist()]
+        for name, index in scored["bucket_indices"].items()
+    }
+    return [score_raw_metrics(row, bucket_scores={name: buckets[i] for name, buckets in bucket_lists.items()}, rubric=rubric)
+            for i, row in enumerate(raw["raw"])]
+
+def analyze_many(transcripts, durations):
+    """Scores a batch of transcripts; returns the same list of dicts as calling analyze_transcript on each."""
+    raw = extract_raw_arrays(transcripts, durations)
+    results = _results(raw, score_arrays(raw), COMPILED_RUBRIC)
+    for result, highlights in zip(results, raw["highlights"]):
+        result["highlights"] = highlights
+    return results
+
+def rescore(rows, rubric=COMPILED_RUBRIC, full=False):
+    """Re-scores stored raw metric dicts (from extract_raw_metrics) under a CompiledRubric.
+
+    Returns score_arrays' output, whose total_score and per-metric scores are arrays; with
+    full=True, a list of score_raw_metrics result dicts (without highlights) instead, which is
+    several times slower since each one is built in Python.
+    """
+    raw = raw_arrays(rows)
+    scored = score_arrays(raw, rubric)
+    return _results(raw, scored, rubric) if full else scored
@@ -0,0 +1,55 @@
+"""Benchmark: batch scoring throughput as the process pool grows.
+
+Usage: python benchmarks/bench_batch.py [--items 2000] [--max-workers N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import score_batch
+
+SAMPLE_SENTENCES = [
+    "Hello everyone, myself Muskan, studying in class 8th B section from Christ Public School.",
+    "I am 13 years old.",
+    "I live with my family.",
+    "There are 3 people in my family, me, my mother and my father.",
+    "One thing I really enjoy is play, playing cricket and taking wickets.",
+    "A fun fact about me is that I see in mirror and talk by myself.",
+    "Um, so, my favorite subject is science because it is, like, very interesting.",
+    "Through science I can explore the whole world and make the discoveries.",
+]
+
+def make_items(count, seed=0):
+    """Builds `count` transcripts of varying length from the sample sentences."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        body = " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(5, 60)))
+        items.append({"id": i, "transcript": body + " Thank you for listening.", "duration_sec": rng.randint(30, 300)})
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    worker_counts = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w <= args.max_workers], args.max_workers})
+
+    print(f"{'workers':>8} {'seconds':>10} {'items/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        score_batch(items[:workers * 2], workers=workers)  # warm up the pool
+        start = time.perf_counter()
+        score_batch(items, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {len(items) / elapsed:>10.1f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
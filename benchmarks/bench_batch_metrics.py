@@ -0,0 +1,50 @@
+"""Benchmark: per-transcript cost of the NumPy batch engine vs. calling analyze_transcript in a loop.
+
+Usage: python benchmarks/bench_batch_metrics.py [--sizes 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_metrics import analyze_many, extract_raw_arrays, score_arrays
+from scoring import analyze_transcript
+from bench_batch import make_items
+
+def per_item_us(elapsed, count):
+    return elapsed / count * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'loop us/item':>13} {'extract us':>11} {'vector us':>10} {'many us/item':>13}")
+    for size in args.sizes:
+        items = make_items(size)
+        transcripts = [item["transcript"] for item in items]
+        durations = [float(item["duration_sec"]) for item in items]
+
+        start = time.perf_counter()
+        for transcript, duration in zip(transcripts, durations):
+            analyze_transcript(transcript, duration)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        raw = extract_raw_arrays(transcripts, durations)
+        extract = time.perf_counter() - start
+        start = time.perf_counter()
+        score_arrays(raw)
+        vector = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyze_many(transcripts, durations)
+        many = time.perf_counter() - start
+
+        print(f"{size:>8} {per_item_us(loop, size):>13.1f} {per_item_us(extract, size):>11.1f} "
+              f"{per_item_us(vector, size):>10.2f} {per_item_us(many, size):>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: grammar-check latency per 1,000 words, inline and through the worker pool.
+
+Usage: python benchmarks/bench_grammar.py [--words 100 1000 10000] [--repeat 20]
+
+"inline" calls GRAMMAR_CHECKER.check directly; "pool" goes through scoring.check_grammar,
+which adds the thread-pool hand-off and the time budget (SCORER_GRAMMAR_BUDGET_MS).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grammar import GRAMMAR_CHECKER
+from scoring import GRAMMAR_BUDGET_SEC, GRAMMAR_WORKERS, TranscriptContext, check_grammar
+from bench_batch import SAMPLE_SENTENCES
+
+def make_transcript(words):
+    """Repeats the sample sentences up to `words` words."""
+    sample = " ".join(SAMPLE_SENTENCES).split()
+    return " ".join((sample * (words // len(sample) + 1))[:words])
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"pool: {GRAMMAR_WORKERS} workers, budget {GRAMMAR_BUDGET_SEC * 1000:.0f} ms")
+    print(f"{'mode':>7} {'words':>7} {'issues':>7} {'p50 ms':>9} {'p95 ms':>9} {'ms/1k words':>12} {'timeouts':>9}")
+    for words in args.words:
+        transcript = make_transcript(words)
+        spans = TranscriptContext(transcript, 60).sentence_spans
+        modes = [("inline", lambda: GRAMMAR_CHECKER.check(transcript, spans)),
+                 ("pool", lambda: check_grammar(transcript, spans))]
+        for name, run in modes:
+            samples, timeouts, issues = [], 0, None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = run()
+                samples.append(time.perf_counter() - start)
+                if result is None:
+                    timeouts += 1
+                else:
+                    issues = len(result)
+            p50 = percentile(samples, 0.5) * 1000
+            print(f"{name:>7} {words:>7} {issues if issues is not None else '-':>7} {p50:>9.2f} "
+                  f"{percentile(samples, 0.95) * 1000:>9.2f} {p50 * 1000 / words:>12.3f} {timeouts:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: cold import time of the scoring core and web layer, checked against a budget.
+
+Usage: python benchmarks/bench_import_time.py [--runs 5] [--budget-ms 60]
+
+Each module is imported in a fresh `python -X importtime` process; the median cumulative time
+is compared with the budget, and importing must not pull in Flask or NLTK. Exits with status 1
+if any check fails, so it can gate CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of a plain import of each module
+FORBIDDEN = {
+    "scoring": ["flask", "nltk", "numpy", "concurrent.futures", "sqlite3"],
+    "completecode": ["flask", "nltk", "numpy"],
+}
+
+def import_time_us(module):
+    """Returns the cumulative -X importtime microseconds for `module` in a fresh interpreter."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"No importtime entry for {module}")
+
+def loaded_forbidden(module):
+    """Returns the forbidden modules present in sys.modules after importing `module`."""
+    code = f"import sys, {module}; print(' '.join(m for m in {FORBIDDEN[module]!r} if m in sys.modules))"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return completed.stdout.split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    args = parser.parse_args()
+
+    failed = False
+    for module in FORBIDDEN:
+        import_time_us(module)  # write the .pyc files so runs measure a warm-disk cold start
+    print(f"{'module':>14} {'median ms':>10} {'budget ms':>10}  status")
+    for module in FORBIDDEN:
+        median_ms = statistics.median(import_time_us(module) for _ in range(args.runs)) / 1000
+        leaked = loaded_forbidden(module)
+        status = "ok"
+        if median_ms > args.budget_ms:
+            status = "OVER BUDGET"
+        if leaked:
+            status = f"imports {', '.join(leaked)}"
+        failed = failed or status != "ok"
+        print(f"{module:>14} {median_ms:>10.1f} {args.budget_ms:>10.1f}  {status}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: pacing analysis cost per word, and peak memory of streamed vs. fully loaded word lists.
+
+Usage: python benchmarks/bench_pacing.py [--sizes 1000 100000 1000000]
+
+For each size, a synthetic ASR word stream (NDJSON, about 150 WPM with pauses) is read twice:
+line by line through read_ndjson_words, and as one JSON array loaded up front. The µs/word
+should stay flat as the size grows, since the windowed pass is linear.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pacing import read_ndjson_words, read_timed_words
+
+def make_words(count, seed=0):
+    rng = random.Random(seed)
+    t, words = 0.0, []
+    for i in range(count):
+        t += 0.15 + (rng.random() * 1.2 if rng.random() < 0.05 else 0.0)
+        end = t + 0.2 + rng.random() * 0.15
+        words.append({"word": f"w{i % 500}", "start": round(t, 3), "end": round(end, 3)})
+        t = end
+    return words
+
+def measure(read):
+    tracemalloc.start()
+    start = time.perf_counter()
+    read()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'words':>8} {'stream us/word':>15} {'stream peak MB':>15} {'list us/word':>13} {'list peak MB':>13}")
+    for size in args.sizes:
+        words = make_words(size)
+        lines = [json.dumps(word) for word in words]
+        array = "[" + ",".join(lines) + "]"
+        del words
+
+        def streamed():
+            _, stream = read_ndjson_words(iter(lines))
+            read_timed_words(stream)[1].summary()
+
+        def loaded():
+            read_timed_words(json.loads(array))[1].summary()
+
+        stream_sec, stream_peak = measure(streamed)
+        list_sec, list_peak = measure(loaded)
+        print(f"{size:>8} {stream_sec / size * 1e6:>15.2f} {stream_peak / 1e6:>15.1f} "
+              f"{list_sec / size * 1e6:>13.2f} {list_peak / 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
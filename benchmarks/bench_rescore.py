@@ -0,0 +1,67 @@
+"""Benchmark: re-scoring stored raw metrics vs. re-analyzing the transcripts.
+
+Usage: python benchmarks/bench_rescore.py [--records 1000000] [--distinct 2000]
+
+Raw metrics for --distinct synthetic transcripts are extracted once and repeated up to
+--records rows. Reports the time to re-analyze --distinct transcripts (scaled to --records),
+to re-score all rows as arrays and as full result dicts, and rescore_cli.py's two input
+paths: raw JSONL (parse + compact re-score) and packed .npz (load + re-score).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_metrics import load_raw, raw_columns, rescore, save_raw, score_arrays
+from rescore_cli import rescore_lines
+from scoring import COMPILED_RUBRIC, RAW_METRICS_VERSION, analyze_transcript, score_batch
+from bench_batch import make_items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = make_items(args.distinct)
+    start = time.perf_counter()
+    for item in items:
+        analyze_transcript(item["transcript"], float(item["duration_sec"]))
+    analyze = (time.perf_counter() - start) * args.records / args.distinct
+
+    distinct_rows = score_batch(items, workers=1, raw=True)
+    rows = (distinct_rows * (args.records // len(distinct_rows) + 1))[:args.records]
+    lines = [json.dumps({"id": i, "raw": row, "raw_version": RAW_METRICS_VERSION}) for i, row in enumerate(rows)]
+
+    start = time.perf_counter()
+    rescore(rows, COMPILED_RUBRIC)
+    arrays = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in rescore_lines(lines, COMPILED_RUBRIC):
+        pass
+    jsonl = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "raw.npz")
+        save_raw(path, range(len(rows)), raw_columns(rows), RAW_METRICS_VERSION)
+        start = time.perf_counter()
+        _, loaded, _ = load_raw(path)
+        score_arrays(loaded, COMPILED_RUBRIC)
+        packed = time.perf_counter() - start
+    sample = rows[:min(len(rows), 100000)]
+    start = time.perf_counter()
+    rescore(sample, COMPILED_RUBRIC, full=True)
+    full = (time.perf_counter() - start) * len(rows) / len(sample)
+
+    print(f"{args.records} records")
+    print(f"{'re-analyze (estimated)':<28} {analyze:>9.2f} s")
+    print(f"{'rescore arrays':<28} {arrays:>9.2f} s")
+    print(f"{'rescore JSONL, compact':<28} {jsonl:>9.2f} s")
+    print(f"{'rescore packed .npz':<28} {packed:>9.2f} s")
+    print(f"{'rescore full dicts (est.)':<28} {full:>9.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark: encode time and payload size of /score responses, verbose vs. compact, per encoder.
+
+Usage: python benchmarks/bench_serialization.py [--sizes 100 1000 10000] [--repeat 2000]
+
+Encoders are the standard json module, orjson and msgpack, each skipped if not installed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from json_backend import load_msgpack, resolve_json_backend
+from scoring import analyze_transcript
+from synthetic import generate_transcript
+
+def encoders():
+    found = {"json": resolve_json_backend("json")[1]}
+    name, dumps, _ = resolve_json_backend("auto")
+    if name == "orjson":
+        found["orjson"] = dumps
+    msgpack_codec = load_msgpack()
+    if msgpack_codec is not None:
+        found["msgpack"] = msgpack_codec[0]
+    return found
+
+def time_encode(dumps, result, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dumps(result)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--json", help="Also write the measurements to this file.")
+    args = parser.parse_args()
+
+    found = encoders()
+    rows = []
+    print(f"{'words':>6} {'format':<8} {'encoder':<8} {'bytes':>8} {'encode us':>10}")
+    for size in args.sizes:
+        transcript = generate_transcript(size, seed=size)
+        for mode in ("verbose", "compact"):
+            result = analyze_transcript(transcript, size * 0.45, compact=mode == "compact")
+            for name, dumps in found.items():
+                row = {"words": size, "format": mode, "encoder": name, "bytes": len(dumps(result)),
+                       "encode_us": time_encode(dumps, result, args.repeat) * 1e6}
+                rows.append(row)
+                print(f"{size:>6} {mode:<8} {name:<8} {row['bytes']:>8} {row['encode_us']:>10.1f}")
+    missing = [name for name in ("orjson", "msgpack") if name not in found]
+    if missing:
+        print(f"Not installed: {', '.join(missing)}", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: peak RSS of streaming analysis from 10 KB to 1 GB inputs.
+
+Usage: python benchmarks/bench_stream_memory.py [--sizes 10K 1M 100M 1G] [--ttr mattr] [--full-max 100M]
+
+Each size runs in a fresh process that generates the transcript on the fly and feeds it to
+streaming.analyze_stream, so peak RSS is the analysis itself; it should stay flat as the input
+grows. Sizes up to --full-max are also scored with analyze_transcript on the materialized
+text for comparison.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {benchmarks!r})
+from bench_batch import SAMPLE_SENTENCES
+size, mode, ttr = {size}, {mode!r}, {ttr!r}
+block = " ".join(SAMPLE_SENTENCES) + " "
+chunk = (block * (1024 * 1024 // len(block) + 1))[:1024 * 1024]
+def chunks():
+    remaining = size
+    while remaining > 0:
+        yield chunk[:remaining]
+        remaining -= len(chunk)
+start = time.perf_counter()
+if mode == "stream":
+    from streaming import analyze_stream
+    result = analyze_stream(chunks(), 3600, ttr_method=ttr)
+else:
+    from scoring import analyze_transcript
+    result = analyze_transcript("".join(chunks()), 3600)
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, result["total_word_count"])
+"""
+
+def parse_size(text):
+    text = text.upper()
+    return int(float(text[:-1]) * UNITS[text[-1]]) if text[-1] in UNITS else int(text)
+
+def run(size, mode, ttr):
+    code = CHILD.format(root=ROOT, benchmarks=os.path.join(ROOT, "benchmarks"), size=size, mode=mode, ttr=ttr)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+    return float(out[0]), int(out[1]) / 1024, int(out[2]) # ru_maxrss is in KiB on Linux
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10K", "1M", "100M", "1G"])
+    parser.add_argument("--ttr", choices=["mattr", "hll", "exact"], default="mattr")
+    parser.add_argument("--full-max", default="100M", help="Largest size also scored with analyze_transcript (0 = none).")
+    args = parser.parse_args()
+
+    full_max = parse_size(args.full_max)
+    print(f"{'mode':>7} {'input':>7} {'words':>12} {'seconds':>9} {'MB/s':>7} {'peak RSS MiB':>13}")
+    for label in args.sizes:
+        size = parse_size(label)
+        modes = ["stream"] + (["full"] if size <= full_max else [])
+        for mode in modes:
+            seconds, rss_mib, words = run(size, mode, args.ttr)
+            print(f"{mode:>7} {label:>7} {words:>12,} {seconds:>9.2f} {size / seconds / 1024 ** 2:>7.1f} {rss_mib:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark suite: per-helper micro-benchmarks and end-to-end scoring, gated against a stored baseline.
+
+Usage:
+    python benchmarks/bench_suite.py                        # run, compare with baseline.json
+    python benchmarks/bench_suite.py --max-regression 15    # fail if anything is >15% slower
+    python benchmarks/bench_suite.py --save-baseline        # record a new baseline.json
+    python benchmarks/bench_suite.py --filter analyze       # only benchmarks whose name contains "analyze"
+
+Inputs come from synthetic.generate_transcript with fixed seeds. Each benchmark reports the
+median time per call over --repeat runs. Times are also divided by a pure-Python calibration
+loop, so a baseline recorded on one machine is roughly comparable on another; pass
+--absolute to compare raw times instead. Exits 1 if any benchmark regressed by more than
+--max-regression percent.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from grammar import GRAMMAR_CHECKER
+from scoring import (COMPILED_RUBRIC, PHRASE_MATCHER, RUBRIC, TranscriptContext, analyze_transcript, calculate_ttr,
+                     calculate_wpm, check_content_keywords, check_flow, count_filler_words, get_score_and_feedback,
+                     safe_word_tokenize)
+from synthetic import generate_transcript
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+END_TO_END_WORDS = [100, 1000, 10000]
+
+def _calibration():
+    total = 0
+    for i in range(100000):
+        total += i % 7
+    return total
+
+def build_benchmarks():
+    """Returns [(name, fn)]; each fn scores or processes fixed synthetic input."""
+    text = generate_transcript(1000, seed=1)
+    words = safe_word_tokenize(text)
+    spans = TranscriptContext(text, 60).sentence_spans
+    wpm_buckets = RUBRIC["Speech Rate"]["Metrics"]["Speech rate (WPM)"]["ScoringBuckets"]
+    benchmarks = [
+        ("calibration", _calibration),
+        ("safe_word_tokenize[1k words]", lambda: safe_word_tokenize(text)),
+        ("calculate_ttr[1k words]", lambda: calculate_ttr(words)),
+        ("calculate_wpm", lambda: calculate_wpm(1000, 420.0)),
+        ("count_filler_words[1k words]", lambda: count_filler_words(text)),
+        ("check_content_keywords[1k words]", lambda: check_content_keywords(text)),
+        ("check_flow[1k words]", lambda: check_flow(text)),
+        ("phrase_scan[1k words]", lambda: PHRASE_MATCHER.scan(text)),
+        ("grammar_check[1k words]", lambda: GRAMMAR_CHECKER.check(text, spans)),
+        ("get_score_and_feedback", lambda: get_score_and_feedback(131.5, wpm_buckets)),
+        ("compiled_lookup", lambda: COMPILED_RUBRIC.lookup("Speech rate (WPM)", 131.5)),
+    ]
+    for size in END_TO_END_WORDS:
+        transcript = generate_transcript(size, seed=size)
+        benchmarks.append((f"analyze_transcript[{size} words]", lambda transcript=transcript: analyze_transcript(transcript, 60)))
+    return benchmarks
+
+def time_call(fn, repeat, min_time=0.05):
+    """Median seconds per call; each of `repeat` samples loops fn for at least min_time."""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return statistics.median(samples)
+
+def compare(results, baseline, max_regression, absolute):
+    """Prints a comparison table; returns the names that regressed by more than max_regression percent."""
+    key = "seconds" if absolute else "relative"
+    regressions = []
+    print(f"{'benchmark':<36} {'time':>11} {'baseline':>11} {'change':>8}")
+    for name, entry in results.items():
+        previous = baseline.get(name)
+        if previous is None or name == "calibration":
+            print(f"{name:<36} {_format_time(entry['seconds']):>11} {'-':>11} {'':>8}")
+            continue
+        change = (entry[key] / previous[key] - 1) * 100
+        flag = " REGRESSION" if change > max_regression else ""
+        print(f"{name:<36} {_format_time(entry['seconds']):>11} {_format_time(previous['seconds']):>11} {change:>+7.1f}%{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def _format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline instead of comparing.")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed slowdown in percent (default: 20).")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--absolute", action="store_true", help="Compare raw times rather than calibration-relative ones.")
+    args = parser.parse_args()
+
+    results = {}
+    calibration = None
+    for name, fn in build_benchmarks():
+        if name != "calibration" and args.filter not in name:
+            continue
+        seconds = time_call(fn, args.repeat)
+        calibration = calibration or seconds
+        results[name] = {"seconds": seconds, "relative": seconds / calibration}
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        for name, entry in results.items():
+            print(f"{name:<36} {_format_time(entry['seconds']):>11}")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+    regressions = compare(results, baseline, args.max_regression, args.absolute)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.max_regression:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
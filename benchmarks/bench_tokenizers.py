@@ -0,0 +1,59 @@
+"""Benchmark: tokens/sec of each tokenizer backend on 1 KB, 100 KB and 10 MB inputs.
+
+Usage: python benchmarks/bench_tokenizers.py [--repeat 3]
+
+"legacy" is the old per-call try NLTK / except -> regex path; without punkt data it pays
+an exception on every call.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import load_nltk_tokenizer, regex_word_tokenize
+from bench_batch import SAMPLE_SENTENCES
+
+SIZES = [("1 KB", 1024), ("100 KB", 100 * 1024), ("10 MB", 10 * 1024 * 1024)]
+
+def make_text(size):
+    """Repeats the sample sentences up to `size` characters."""
+    block = " ".join(SAMPLE_SENTENCES) + " "
+    return (block * (size // len(block) + 1))[:size]
+
+def legacy_word_tokenize(text):
+    try:
+        from nltk.tokenize import word_tokenize
+        return word_tokenize(text)
+    except Exception:
+        return re.findall(r'\b\w+\b', text.lower())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = [("regex", regex_word_tokenize), ("legacy", legacy_word_tokenize)]
+    try:
+        backends.append(("nltk", load_nltk_tokenizer()))
+    except Exception as e:
+        print(f"nltk: skipped ({type(e).__name__})")
+
+    print(f"{'backend':>8} {'input':>7} {'tokens':>10} {'tokens/s':>12}")
+    for label, size in SIZES:
+        text = make_text(size)
+        for name, tokenize in backends:
+            # Small inputs are tokenized many times per measurement so per-call overhead shows
+            calls = max(1, (1024 * 1024) // size)
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for _ in range(calls):
+                    tokens = tokenize(text)
+                best = min(best, (time.perf_counter() - start) / calls)
+            print(f"{name:>8} {label:>7} {len(tokens):>10} {len(tokens) / best:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
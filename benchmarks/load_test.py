@@ -0,0 +1,213 @@
+"""Load test: drive /score and the index page on a locally started server and report latency percentiles.
+
+Usage:
+    python benchmarks/load_test.py --server threads --server processes:4 --concurrency 16 --duration 20
+    python benchmarks/load_test.py --server gunicorn:4x2 --mix score=9,index=1 --sizes 100:0.7,1000:0.25,10000:0.05
+
+Each --server config is started on a free localhost port, warmed up, loaded for --duration
+seconds by --concurrency client threads over keep-alive connections, and stopped; a comparison
+table follows. Configs:
+    threads          werkzeug server, one thread per request
+    processes:N      werkzeug server, N forked processes
+    gunicorn:WxT     gunicorn with W workers of T threads each (needs gunicorn installed)
+The request mix and transcript sizes (words:weight) are sampled with a fixed seed. The result
+cache is off unless --server-cache is given, so every request is scored. Nothing leaves localhost.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from synthetic import generate_transcript
+
+TRANSCRIPTS_PER_SIZE = 50
+
+def parse_weights(text, key_type=str):
+    """Parses "a=3,b=1" or "100:0.7,1000:0.3" into [(key, weight)]."""
+    pairs = []
+    for part in text.split(","):
+        key, _, weight = part.replace("=", ":").partition(":")
+        pairs.append((key_type(key), float(weight or 1)))
+    return pairs
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_command(config, port):
+    """Returns the argv that serves create_app() on port for a config like "threads" or "gunicorn:4x2"."""
+    kind, _, arg = config.partition(":")
+    if kind == "threads":
+        options = "threaded=True"
+    elif kind == "processes":
+        options = f"threaded=False, processes={int(arg or os.cpu_count() or 1)}"
+    elif kind == "gunicorn":
+        workers, _, threads = (arg or "2x1").partition("x")
+        return [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", workers,
+                "--threads", threads or "1", "--log-level", "warning", "completecode:create_app()"]
+    else:
+        raise ValueError(f"Unknown server config: {config!r}")
+    code = ("from werkzeug.serving import run_simple; from completecode import create_app; "
+            f"run_simple('127.0.0.1', {port}, create_app(), {options})")
+    return [sys.executable, "-c", code]
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not start within {timeout}s")
+
+def percentile(ordered, q):
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class LoadClient(threading.Thread):
+    """One client thread: sends requests from a shared plan until stop is set, recording (kind, seconds, ok)."""
+
+    def __init__(self, port, plan, bodies, stop, seed):
+        super().__init__(daemon=True)
+        self.port = port
+        self.plan = plan
+        self.bodies = bodies
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.recording = False
+
+    def run(self):
+        connection = None
+        kinds, weights = zip(*self.plan["mix"])
+        sizes, size_weights = zip(*self.plan["sizes"])
+        while not self.stop.is_set():
+            kind = self.rng.choices(kinds, weights)[0]
+            if connection is None:
+                connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            start = time.perf_counter()
+            try:
+                if kind == "score":
+                    size = self.rng.choices(sizes, size_weights)[0]
+                    connection.request("POST", "/score", body=self.rng.choice(self.bodies[size]),
+                                       headers={"Content-Type": "application/json"})
+                else:
+                    connection.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+                connection = None
+            if self.recording:
+                self.samples.append((kind, time.perf_counter() - start, ok))
+        if connection is not None:
+            connection.close()
+
+def run_config(config, args, bodies):
+    """Starts the server for one config, applies load, stops it; returns a summary dict."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    if not args.server_cache:
+        env["SCORER_CACHE_MAX_BYTES"] = "0"
+    server = subprocess.Popen(server_command(config, port), cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+        stop = threading.Event()
+        plan = {"mix": args.mix, "sizes": args.sizes}
+        clients = [LoadClient(port, plan, bodies, stop, seed=args.seed + i) for i in range(args.concurrency)]
+        for client in clients:
+            client.start()
+        time.sleep(args.warmup)
+        for client in clients:
+            client.recording = True
+        start = time.perf_counter()
+        time.sleep(args.duration)
+        for client in clients:
+            client.recording = False
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    samples = [sample for client in clients for sample in client.samples]
+    summary = {"config": config, "requests": len(samples), "seconds": elapsed, "endpoints": {}}
+    for kind in ["all"] + sorted({kind for kind, _, _ in samples}):
+        selected = [sample for sample in samples if kind == "all" or sample[0] == kind]
+        latencies = sorted(seconds for _, seconds, _ in selected)
+        errors = sum(1 for _, _, ok in selected if not ok)
+        summary["endpoints"][kind] = {
+            "requests": len(selected),
+            "throughput_rps": len(selected) / elapsed,
+            "error_rate": errors / len(selected) if selected else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000
+        }
+    return summary
+
+def print_table(summaries):
+    print(f"{'server':<16} {'endpoint':<8} {'requests':>9} {'req/s':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for summary in summaries:
+        for kind, stats in summary["endpoints"].items():
+            print(f"{summary['config']:<16} {kind:<8} {stats['requests']:>9} {stats['throughput_rps']:>9.1f} "
+                  f"{stats['error_rate']:>6.1%} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", action="append", help="Server config (repeatable; default: threads).")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per config.")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default="score=9,index=1", help="Request mix weights (score, index).")
+    parser.add_argument("--sizes", default="100:0.6,1000:0.3,10000:0.1", help="Transcript words:weight distribution.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server-cache", action="store_true", help="Leave the server's result cache on.")
+    parser.add_argument("--json", help="Also write the summaries to this file.")
+    args = parser.parse_args()
+    args.mix = parse_weights(args.mix)
+    args.sizes = parse_weights(args.sizes, int)
+
+    bodies = {
+        size: [json.dumps({"transcript": generate_transcript(size, seed=args.seed * 1000 + i), "duration_sec": size * 0.45})
+               for i in range(TRANSCRIPTS_PER_SIZE)]
+        for size, _ in args.sizes
+    }
+    summaries = []
+    for config in args.server or ["threads"]:
+        print(f"Running {config} ...", file=sys.stderr)
+        summaries.append(run_config(config, args, bodies))
+    print_table(summaries)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+if __name__ == "__main__":
+    main()
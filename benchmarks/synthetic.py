@@ -0,0 +1,76 @@
+"""Deterministic synthetic self-introductions for benchmarks.
+
+generate_transcript() builds a transcript of a given length whose filler density, key-word
+coverage and vocabulary richness can be dialed independently; the same arguments always give
+the same text. Used by bench_suite.py and available to the other benchmarks.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import CLOSING_PHRASES, FILLER_WORDS, KEYWORD_PHRASES, SALUTATION_PHRASES
+
+_COMMON_WORDS = (
+    "the a and to of in is it that for on with as at by this from my we our be was are have has had "
+    "school class friends family teacher study play music books science games learn years city time "
+    "day week morning evening weekend really very always often sometimes also because when where"
+).split()
+_SYLLABLES = ["ba", "ko", "ri", "ten", "ma", "lu", "sen", "di", "po", "ran", "vi", "el", "mo", "tar", "ni", "qua"]
+_SENTENCE_WORDS = (8, 16)
+
+def _invented_word(index):
+    """A distinct pronounceable word for each index (base-16 over the syllables)."""
+    syllables = []
+    index += len(_SYLLABLES) # at least two syllables
+    while index:
+        index, digit = divmod(index, len(_SYLLABLES))
+        syllables.append(_SYLLABLES[digit])
+    return "".join(reversed(syllables))
+
+def _vocabulary(size):
+    words = list(_COMMON_WORDS[:size])
+    words.extend(_invented_word(i) for i in range(size - len(words)))
+    return words
+
+def generate_transcript(words=200, filler_density=0.03, keyword_coverage=0.75, vocabulary_richness=0.6, seed=0,
+                        salutation=True, closing=True):
+    """Returns a self-introduction of about `words` words.
+
+    filler_density: fraction of words that are filler words.
+    keyword_coverage: fraction of the rubric's key-word categories mentioned (0 to 1).
+    vocabulary_richness: distinct body words / body words, which drives TTR.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    if salutation:
+        sentences.append(f"{rng.choice(SALUTATION_PHRASES).capitalize()} everyone.")
+    categories = sorted(KEYWORD_PHRASES)
+    for category in rng.sample(categories, round(keyword_coverage * len(categories))):
+        sentences.append(f"I want to share my {rng.choice(KEYWORD_PHRASES[category])} with you.")
+    fixed_words = sum(len(sentence.split()) for sentence in sentences) + (3 if closing else 0)
+
+    body_count = max(0, words - fixed_words)
+    filler_count = round(body_count * filler_density)
+    plain_count = body_count - filler_count
+    vocabulary = _vocabulary(max(1, round(plain_count * vocabulary_richness)))
+    # Every vocabulary word once, then repeats, so distinct/total tracks vocabulary_richness
+    body = vocabulary[:plain_count] + [rng.choice(vocabulary) for _ in range(plain_count - len(vocabulary))]
+    rng.shuffle(body)
+    for _ in range(filler_count):
+        body.insert(rng.randrange(len(body) + 1), rng.choice(FILLER_WORDS))
+
+    position = 0
+    while position < len(body):
+        length = rng.randint(*_SENTENCE_WORDS)
+        chunk = body[position:position + length]
+        position += length
+        sentences.append(" ".join(chunk).capitalize() + ".")
+    if closing:
+        sentences.append(f"{rng.choice(CLOSING_PHRASES).capitalize()} everyone.")
+    return " ".join(sentences)
+
+def generate_corpus(count, words=200, seed=0, **options):
+    """Returns `count` transcripts with per-transcript seeds derived from `seed`."""
+    return [generate_transcript(words, seed=seed * 1_000_003 + i, **options) for i in range(count)]
@@ -1,364 +1,631 @@
-import json
-import re
-from flask import Flask, request, jsonify, render_template_string
-from nltk.tokenize import word_tokenize
-from nltk.text import Text
-def safe_word_tokenize(text):
-    """Tokenizes text using regex as a fallback if NLTK context is missing."""
-    try:
-        return word_tokenize(text)
-    except Exception:
-        return re.findall(r'\b\w+\b', text.lower())
-RUBRIC = {
-    "Content & Structure": {
-        "Weightage": 40,
-        "Metrics": {
-            "Salutation Level": {
-                "Weightage": 5,
-                "Rules": [
-                    {"Description": "Score if a clear salutation is present (e.g., 'Hello everyone', 'Good morning').", "PassScore": 5, "Threshold": 1} # 1 = yes
-                ]
-            },
-            "Key word Presence": {
-                "Weightage": 30,
-                "Keywords": ["name", "age", "class", "school", "family", "hobbies", "goals", "unique point"],
-                "Rules": [
-                    # Score is calculated based on the number of keywords found (max 30 points)
-                    {"Description": "Points scaled by keywords found (out of 8 defined keywords).", "MaxScore": 30}
-                ]
-            },
-            "Flow": {
-                "Weightage": 5,
-                "Rules": [
-                    {"Description": "Score if the introduction follows a logical order (Salutation -> Details -> Closing).", "PassScore": 5, "Threshold": 1} # 1 = yes
-                ]
-            }
-        }
-    },
-    "Speech Rate": {
-        "Weightage": 10,
-        "Metrics": {
-            "Speech rate (WPM)": {
-                "Weightage": 10,
-                "ScoringBuckets": [
-                    {"Range": "111 - 140 WPM", "Score": 10, "Feedback": "Excellent pace! Very comfortable for listening."},
-                    {"Range": "> 140 WPM", "Score": 6, "Feedback": "A bit too fast. Try to slow down for better clarity."},
-                    {"Range": "81 - 110 WPM", "Score": 6, "Feedback": "A bit slow. Speed up slightly to keep listeners engaged."},
-                    {"Range": "< 80 WPM", "Score": 2, "Feedback": "Too slow. The pace significantly impacts engagement."}
-                ]
-            }
-        }
-    },
-    "Language & Grammar": {
-        "Weightage": 20, # Combined weight for the two metrics
-        "Metrics": {
-            "Grammar errors (Score)": {
-                "Weightage": 10,
-                "ScoringBuckets": [
-                    {"Range": "> 0.9", "Score": 10, "Feedback": "Impeccable grammar. Very high quality language use."},
-                    {"Range": "0.7 to 0.89", "Score": 8, "Feedback": "Good grammar, only minor, non-distracting errors."},
-                    {"Range": "0.5 to 0.69", "Score": 6, "Feedback": "Average grammar, with a few noticeable errors."},
-                    {"Range": "0.3 to 0.49", "Score": 4, "Feedback": "Needs significant improvement in grammar and sentence structure."},
-                    {"Range": "< 0.3", "Score": 2, "Feedback": "Severe grammar issues that compromise clarity."}
-                ]
-            },
-            "Vocabulary richness (TTR)": {
-                "Weightage": 10,
-                "ScoringBuckets": [
-                    {"Range": "0.9–1.0", "Score": 10, "Feedback": "Excellent vocabulary richness (TTR). Diverse and engaging word choices."},
-                    {"Range": "0.7–0.89", "Score": 8, "Feedback": "Good vocabulary. Sufficient variation in word choice."},
-                    {"Range": "0.5–0.69", "Score": 6, "Feedback": "Acceptable vocabulary, but could be more diverse."},
-                    {"Range": "0.3–0.49", "Score": 4, "Feedback": "Low vocabulary richness. Repetitive and basic word usage."},
-                    {"Range": "0–0.29", "Score": 2, "Feedback": "Very low vocabulary richness, making the text monotonous."}
-                ]
-            }
-        }
-    },
-    "Clarity": {
-        "Weightage": 30,
-        "Metrics": {
-            "Filler Word Rate": {
-                "Weightage": 30,
-                "ScoringBuckets": [
-                    {"Range": "< 1.0%", "Score": 30, "Feedback": "Exceptional clarity. No distracting filler words."},
-                    {"Range": "1.0% - 1.9%", "Score": 25, "Feedback": "Very good clarity. Minimal use of filler words."},
-                    {"Range": "2.0% - 2.9%", "Score": 20, "Feedback": "Good clarity. Filler usage is present but not excessive."},
-                    {"Range": "3.0% - 3.9%", "Score": 15, "Feedback": "Average clarity. Reduce filler words for better impact."},
-                    {"Range": "4.0% - 4.9%", "Score": 10, "Feedback": "Low clarity. Excessive filler words distract the listener."},
-                    {"Range": "> 5.0%", "Score": 5, "Feedback": "Very low clarity. The presentation is heavily disrupted by filler words."}
-                ]
-            }
-        }
-    }
-}
-
-# --- 2. LOGIC FUNCTIONS ---
-
-def calculate_wpm(word_count, duration_sec):
-    """Calculates Words Per Minute (WPM)."""
-    if duration_sec <= 0:
-        return 0
-    return (word_count / duration_sec) * 60
-
-def calculate_ttr(words):
-    """Calculates Type-Token Ratio (TTR)."""
-    if not words:
-        return 0.0
-    return len(set(words)) / len(words)
-
-def count_filler_words(text):
-    """Counts common filler words in the text."""
-    filler_words = ["um", "uh", "like", "you know", "so", "actually", "basically", "right", "i mean", "well", "kinda", "sort of", "okay", "hmm", "ah"]
-    # Case-insensitive search
-    count = 0
-    text_lower = text.lower()
-    for filler in filler_words:
-        # Use regex to count whole word matches
-        count += len(re.findall(r'\b' + re.escape(filler) + r'\b', text_lower))
-    return count
-
-def check_content_keywords(text):
-    """Checks for the presence of mandatory content keywords."""
-    text_lower = text.lower()
-    keywords = ["name", "age", "class", "school", "family", "hobbies", "goals", "unique point"]
-    found_keywords = 0
-    
-    # Simple semantic check based on keyword presence
-    keyword_map = {
-        "name": ["i am", "myself", "my name"],
-        "age": ["i am", "years old"],
-        "class": ["class", "grade"],
-        "school": ["school", "university", "college"],
-        "family": ["family", "parents", "mother", "father", "siblings"],
-        "hobbies": ["enjoy", "like to", "hobbies", "interests", "play"],
-        "goals": ["want to be", "my goal", "aspire to", "future"],
-        "unique point": ["special thing", "fun fact", "one thing people don't know"]
-    }
-    
-    found_details = {}
-    
-    for key, phrases in keyword_map.items():
-        if any(phrase in text_lower for phrase in phrases):
-            found_keywords += 1
-            found_details[key] = True
-        else:
-            found_details[key] = False
-            
-    return found_keywords, found_details
-
-def check_flow(text):
-    """Checks for flow (Salutation -> Details -> Closing). A highly simplified check."""
-    text_lower = text.lower()
-    
-    # 1. Salutation Check
-    salutation_phrases = ["hello", "good morning", "greetings"]
-    has_salutation = any(text_lower.startswith(p) for p in salutation_phrases)
-    
-    # 2. Closing Check (must be near the end)
-    closing_phrases = ["thank you", "that is all", "i'm done"]
-    has_closing = any(p in text_lower[-50:] for p in closing_phrases)
-    
-    # Simple flow score: 5 points if both are present.
-    return 1 if has_salutation and has_closing else 0
-
-def get_score_and_feedback(metric_value, scoring_buckets, is_filler_rate=False):
-    """Finds the corresponding score and feedback based on the metric value and scoring buckets."""
-    best_match = None
-    
-    # If the scoring is based on filler rate (lower is better, higher score at top)
-    if is_filler_rate:
-        for bucket in scoring_buckets:
-            range_str = bucket["Range"].replace("%", "").strip()
-            if range_str.startswith('<'):
-                threshold = float(range_str.split('<')[1].strip())
-                if metric_value < threshold:
-                    best_match = bucket
-                    break
-            elif range_str.startswith('>'):
-                threshold = float(range_str.split('>')[1].strip())
-                if metric_value > threshold:
-                    best_match = bucket
-                    break
-            else: # Format X.X - Y.Y
-                low, high = map(float, [r.strip() for r in range_str.split('-')])
-                if low <= metric_value <= high:
-                    best_match = bucket
-                    break
-    else:
-        for bucket in scoring_buckets:
-            range_str = bucket["Range"].strip()
-            
-            if "WPM" in range_str: 
-                wpm = metric_value
-                if '111 - 140' in range_str and 111 <= wpm <= 140:
-                    best_match = bucket
-                    break
-                elif range_str.startswith('>') and wpm > 140:
-                    best_match = bucket
-                    break
-                elif '81 - 110' in range_str and 81 <= wpm <= 110:
-                    best_match = bucket
-                    break
-                elif range_str.startswith('<') and wpm < 80:
-                    best_match = bucket
-                    break
-            
-            else: 
-                range_str = range_str.replace('–', 'to').strip()
-                if range_str.startswith('>'):
-                    threshold = float(range_str.split('>')[1].strip())
-                    if metric_value > threshold:
-                        best_match = bucket
-                        break
-                elif range_str.startswith('<'):
-                    threshold = float(range_str.split('<')[1].strip())
-                    if metric_value < threshold:
-                        best_match = bucket
-                        break
-                else: 
-                    try:
-                        low, high = map(float, [r.strip() for r in range_str.split('to')])
-                        if low <= metric_value <= high:
-                            best_match = bucket
-                            break
-                    except:
-                        best_match = scoring_buckets[-1] 
-    if best_match is None:
-        return scoring_buckets[-1]["Score"], scoring_buckets[-1]["Feedback"]
-        
-    return best_match["Score"], best_match["Feedback"]
-
-def analyze_transcript(transcript, duration_sec):
-    """The main scoring and feedback generation logic."""
-    
-    results = {}
-    total_score = 0
-    
-    # 1. Text Pre-processing
-    words = safe_word_tokenize(transcript)
-    word_count = len(words)
-    
-    # --- 2. Calculation of Raw Metrics ---
-    
-    # --- Core Metrics ---
-    wpm = calculate_wpm(word_count, duration_sec)
-    ttr = calculate_ttr(words)
-    filler_count = count_filler_words(transcript)
-    filler_rate = (filler_count / word_count) * 100 if word_count > 0 else 100.0
-    found_keywords, keyword_details = check_content_keywords(transcript)
-    has_salutation = 1 if re.match(r'^\s*(hello|good (morning|day)|greetings)', transcript.lower()) else 0
-    has_flow = check_flow(transcript)
-    mock_errors_per_100_words = 0.8 
-    errors_per_100_words = mock_errors_per_100_words
-    grammar_score_raw = 1 - min(errors_per_100_words / 10, 1)
-    
-    detailed_scores = {}
-    
-    content_scores = detailed_scores.setdefault("Content & Structure", {"TotalScore": 0, "Metrics": {}})
-    score_salutation = 5 if has_salutation else 0
-    feedback_salutation = "Clear salutation present." if has_salutation else "Missing a clear, engaging salutation."
-    content_scores["Metrics"]["Salutation Level"] = {"Value": has_salutation, "Score": score_salutation, "Feedback": feedback_salutation, "Weightage": 5}
-    content_scores["TotalScore"] += score_salutation
-    
-    keyword_max_score = RUBRIC["Content & Structure"]["Metrics"]["Key word Presence"]["Rules"][0]["MaxScore"]
-    score_keyword = int(keyword_max_score * (found_keywords / 8))
-    feedback_keyword = f"Found {found_keywords} out of 8 key self-introduction details. (Missing: {', '.join([k for k, v in keyword_details.items() if not v])})"
-    content_scores["Metrics"]["Key word Presence"] = {"Value": f"{found_keywords}/8", "Score": score_keyword, "Feedback": feedback_keyword, "Weightage": 30}
-    content_scores["TotalScore"] += score_keyword
-    
-    score_flow = 5 if has_flow else 0
-    feedback_flow = "The introduction follows a logical start-to-end structure." if has_flow else "The flow is hard to follow. Ensure a clear start and end."
-    content_scores["Metrics"]["Flow"] = {"Value": has_flow, "Score": score_flow, "Feedback": feedback_flow, "Weightage": 5}
-    content_scores["TotalScore"] += score_flow
-
-    total_score += content_scores["TotalScore"]
-
-    speech_scores = detailed_scores.setdefault("Speech Rate", {"TotalScore": 0, "Metrics": {}})
-    metric_name = "Speech rate (WPM)"
-    score_wpm, feedback_wpm = get_score_and_feedback(wpm, RUBRIC["Speech Rate"]["Metrics"][metric_name]["ScoringBuckets"])
-    speech_scores["Metrics"][metric_name] = {"Value": f"{wpm:.2f}", "Score": score_wpm, "Feedback": feedback_wpm, "Weightage": 10}
-    speech_scores["TotalScore"] += score_wpm
-    total_score += score_wpm
-    
-    lang_scores = detailed_scores.setdefault("Language & Grammar", {"TotalScore": 0, "Metrics": {}})
-    
-   
-    metric_name = "Grammar errors (Score)"
-    score_grammar, feedback_grammar = get_score_and_feedback(grammar_score_raw, RUBRIC["Language & Grammar"]["Metrics"][metric_name]["ScoringBuckets"])
-    lang_scores["Metrics"][metric_name] = {"Value": f"{grammar_score_raw:.2f}", "Score": score_grammar, "Feedback": feedback_grammar, "Weightage": 10}
-    lang_scores["TotalScore"] += score_grammar
-    
-   
-    metric_name = "Vocabulary richness (TTR)"
-    score_ttr, feedback_ttr = get_score_and_feedback(ttr, RUBRIC["Language & Grammar"]["Metrics"][metric_name]["ScoringBuckets"])
-    lang_scores["Metrics"][metric_name] = {"Value": f"{ttr:.2f}", "Score": score_ttr, "Feedback": feedback_ttr, "Weightage": 10}
-    lang_scores["TotalScore"] += score_ttr
-    
-    total_score += lang_scores["TotalScore"]
-    
-    clarity_scores = detailed_scores.setdefault("Clarity", {"TotalScore": 0, "Metrics": {}})
-    metric_name = "Filler Word Rate"
-    score_filler, feedback_filler = get_score_and_feedback(filler_rate, RUBRIC["Clarity"]["Metrics"][metric_name]["ScoringBuckets"], is_filler_rate=True)
-    clarity_scores["Metrics"][metric_name] = {"Value": f"{filler_rate:.2f}% ({filler_count} filler words)", "Score": score_filler, "Feedback": feedback_filler, "Weightage": 30}
-    clarity_scores["TotalScore"] += score_filler
-    total_score += score_filler
-
-  
-    if total_score >= 90:
-        overall_feedback = "Outstanding introduction! All criteria were met with high marks, demonstrating excellent preparation and delivery."
-    elif total_score >= 75:
-        overall_feedback = "Very strong performance. Good grasp of content, flow, and clarity. Review areas with scores below 10 for continuous improvement."
-    elif total_score >= 50:
-        overall_feedback = "Solid effort. The core content is present, but work on one or two specific areas (like WPM or Filler Rate) could significantly boost your score."
-    else:
-        overall_feedback = "Needs improvement. Focus on ensuring all mandatory content points are covered and practicing your delivery for better pace and clarity."
-
+import gzip
+import hashlib
+import os
+import time
+
+from admission import REASONS, AdmissionControl, PayloadTooLarge
+from job_queue import JobQueue, JobWorkers, QueueFull
+from json_backend import MSGPACK_MIMETYPES, NDJSON_MIMETYPES, json_dumps, json_loads, load_msgpack
+from pacing import read_ndjson_words
+from result_cache import ResultCache, cache_key
+from score_history import ScoreHistory
+# The scoring functions are re-exported here for code that still imports them from completecode
+from scoring import (
+    GRAMMAR_WORKERS, RUBRIC, RUBRIC_VERSION, SessionStore, analyze_transcript, batch_pool_workers, calculate_ttr,
+    calculate_wpm, check_content_keywords, check_flow, count_filler_words, feedback_catalog, get_score_and_feedback, has_estimates,
+    normalize_transcript, safe_word_tokenize, score_batch, validate_score_input, validate_timed_input
+)
+from telemetry import LATENCY_BUCKETS, SIZE_BUCKETS, MetricsRegistry
+
+# --- 1. FLASK APP FACTORY ---
+
+# The job queue's SQLite file unless SCORER_JOBS_DB says otherwise
+DEFAULT_JOBS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite3")
+
+def config_from_env():
+    """Reads the web-layer settings from SCORER_* environment variables."""
     return {
-        "final_score": round(total_score, 0),
-        "total_word_count": word_count,
-        "total_duration_sec": duration_sec,
-        "detailed_feedback": detailed_scores,
-        "overall_feedback": overall_feedback
+        "SCORER_BATCH_MAX_ITEMS": int(os.environ.get("SCORER_BATCH_MAX_ITEMS", 1000)),
+        "SCORER_CACHE_MAX_BYTES": int(os.environ.get("SCORER_CACHE_MAX_BYTES", 64 * 1024 * 1024)), # 0 = no in-memory tier
+        "SCORER_CACHE_DB": os.environ.get("SCORER_CACHE_DB"), # unset = no on-disk tier
+        "SCORER_CACHE_DB_MAX_ROWS": int(os.environ.get("SCORER_CACHE_DB_MAX_ROWS", 100000)), # 0 = no bound
+        "SCORER_SESSION_TTL_SEC": float(os.environ.get("SCORER_SESSION_TTL_SEC", 900)),
+        "SCORER_SESSION_MAX_BYTES": int(os.environ.get("SCORER_SESSION_MAX_BYTES", 64 * 1024 * 1024)),
+        "SCORER_INDEX_MAX_AGE": int(os.environ.get("SCORER_INDEX_MAX_AGE", 300)), # Cache-Control max-age for the page
+        "SCORER_METRICS": os.environ.get("SCORER_METRICS", "1") != "0", # 0 = no /metrics and no stage timing
+        "SCORER_JOBS_DB": os.environ.get("SCORER_JOBS_DB", DEFAULT_JOBS_DB), # ":memory:" = jobs die with the process
+        "SCORER_JOBS_WORKERS": int(os.environ.get("SCORER_JOBS_WORKERS", 2)), # 0 = this process only enqueues
+        "SCORER_JOBS_MAX_DEPTH": int(os.environ.get("SCORER_JOBS_MAX_DEPTH", 1000)),
+        "SCORER_JOBS_VISIBILITY_SEC": float(os.environ.get("SCORER_JOBS_VISIBILITY_SEC", 300)),
+        "SCORER_JOBS_MAX_ATTEMPTS": int(os.environ.get("SCORER_JOBS_MAX_ATTEMPTS", 3)),
+        "SCORER_JOBS_RESULT_TTL_SEC": float(os.environ.get("SCORER_JOBS_RESULT_TTL_SEC", 3600)),
+        "SCORER_HISTORY_DB": os.environ.get("SCORER_HISTORY_DB", ""), # SQLite path; empty = no score history
+        "SCORER_MAX_BODY_BYTES": int(os.environ.get("SCORER_MAX_BODY_BYTES", 8 * 1024 * 1024)), # 0 = no limit
+        "SCORER_MAX_WORDS": int(os.environ.get("SCORER_MAX_WORDS", 20000)), # per transcript; 0 = no limit
+        "SCORER_JOBS_MAX_WORDS": int(os.environ.get("SCORER_JOBS_MAX_WORDS", 0)), # per queued transcript; 0 = no limit
+        "SCORER_RATE_PER_SEC": float(os.environ.get("SCORER_RATE_PER_SEC", 0)), # per client; 0 = no rate limit
+        "SCORER_RATE_BURST": int(os.environ.get("SCORER_RATE_BURST", 20)),
+        "SCORER_CLIENT_HEADER": os.environ.get("SCORER_CLIENT_HEADER", ""), # e.g. X-Forwarded-For; empty = peer address
+        "SCORER_MAX_IN_FLIGHT": int(os.environ.get("SCORER_MAX_IN_FLIGHT", 4 * (os.cpu_count() or 1))), # 0 = no limit
+        "SCORER_ADMISSION_WAIT_SEC": float(os.environ.get("SCORER_ADMISSION_WAIT_SEC", 0.5)),
+        "SCORER_RETRY_AFTER_SEC": int(os.environ.get("SCORER_RETRY_AFTER_SEC", 1)) # Retry-After on 503
     }
 
-# --- 3. FLASK APP SETUP ---
-
-app = Flask(__name__)
-
-@app.route('/', methods=['GET'])
-def index():
-    """Renders the single-page application (SPA) HTML."""
-    return render_template_string(HTML_TEMPLATE)
+def precompress_page(html):
+    """Encodes a static page once: {encoding: (body, etag)} for identity, gzip and, if installed, brotli.
 
-@app.route('/score', methods=['POST'])
-def score_transcript():
-    """API endpoint for scoring the transcript."""
+    ETags are derived from the content hash, with the encoding appended for compressed variants.
+    """
+    body = html.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:20]
+    variants = {
+        "identity": (body, f'"{digest}"'),
+        "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+    }
     try:
-        data = request.json
-        transcript = data.get('transcript', '')
-        duration_sec = data.get('duration_sec', 0)
-        
-        if not transcript or not isinstance(transcript, str):
-            return jsonify({"error": "Transcript text is required."}), 400
-        
+        import brotli
+        variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+    except ImportError:
+        pass
+    return variants
+
+def cached_analyze_transcript(cache, transcript, duration_sec, timings=None, compact=False, pacing=None):
+    """analyze_transcript behind a ResultCache, keyed by transcript, duration, RUBRIC_VERSION and result format.
+
+    timings is passed to analyze_transcript on a miss; the cache lookup is recorded as "cache_lookup".
+    Results with a pacing summary depend on the word timings as well and are not cached.
+    """
+    if not cache.enabled or pacing is not None:
+        return analyze_transcript(transcript, duration_sec, timings, compact, pacing)
+    start = time.perf_counter() if timings is not None else 0
+    key = cache_key(transcript, duration_sec, RUBRIC_VERSION + ("/compact" if compact else ""))
+    result = cache.get(key)
+    if timings is not None:
+        timings["cache_lookup"] = time.perf_counter() - start
+    if result is None:
+        result = analyze_transcript(transcript, duration_sec, timings, compact)
+        # Estimates (e.g. a timed-out grammar check) are not cached, so a later request can do better
+        if not has_estimates(result):
+            cache.put(key, result)
+    return result
+
+class UnsupportedBody(ValueError):
+    """Raised when a request body's Content-Type cannot be decoded (HTTP 415)."""
+
+class BatchTooLarge(PayloadTooLarge):
+    """Raised by validate_batch_items when a batch has more items than allowed (HTTP 413)."""
+
+def validate_batch_items(data, max_items):
+    """Validates a batch body (an array, or {"items": [...]}) and returns (items, ids as strings).
+
+    Raises ValueError with a user-facing message, or BatchTooLarge.
+    """
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ValueError("A non-empty array of items is required.")
+    if len(items) > max_items:
+        raise BatchTooLarge(f"Batch too large: {len(items)} items (maximum {max_items}).")
+    ids = []
+    for item in items:
+        if not isinstance(item, dict) or item.get('id') is None:
+            raise ValueError("Every item must be an object with an id.")
+        ids.append(str(item['id']))
+    if len(set(ids)) != len(ids):
+        raise ValueError("Item ids must be unique.")
+    return items, ids
+
+def parse_iso_day(value, field):
+    """Returns value as a YYYY-MM-DD string (None stays None); raises ValueError naming field otherwise."""
+    if value is None:
+        return None
+    import datetime
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an ISO date (YYYY-MM-DD).")
+
+def validate_history_labels(data):
+    """Returns the optional (cohort, class, date) labels of a /score body; raises ValueError if one is malformed."""
+    labels = []
+    for field in ('cohort', 'class'):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, str) or len(value) > 100):
+            raise ValueError(f"{field} must be a string of at most 100 characters.")
+        labels.append(value or None)
+    return labels[0], labels[1], parse_iso_day(data.get('date'), 'date')
+
+def validate_session_append(data):
+    """Validates a session append body ({text, elapsed_sec}) and returns (normalized text, elapsed_sec or None).
+
+    Raises ValueError with a user-facing message.
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        raise ValueError("Body must be an object with text and elapsed_sec.")
+    text = data.get('text', '')
+    if not isinstance(text, str):
+        raise ValueError("Text must be a string.")
+    elapsed_sec = data.get('elapsed_sec')
+    if elapsed_sec is not None:
         try:
-            duration_sec = float(duration_sec)
-        except ValueError:
-            return jsonify({"error": "Duration must be a valid number in seconds."}), 400
-            
-        if duration_sec <= 0:
-            duration_sec = 60 
-        result = analyze_transcript(transcript, duration_sec)
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        # Generic error handling
-        print(f"An error occurred: {e}")
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
-
+            elapsed_sec = float(elapsed_sec)
+        except (TypeError, ValueError):
+            raise ValueError("Elapsed time must be a valid number in seconds.")
+        if elapsed_sec < 0:
+            raise ValueError("Elapsed time cannot be negative.")
+    return normalize_transcript(text), elapsed_sec
+
+def batch_response(ids, outcomes):
+    """The /score/batch response body for per-item outcomes."""
+    error_count = sum(1 for outcome in outcomes if "error" in outcome)
+    return {"results": dict(zip(ids, outcomes)), "count": len(outcomes), "error_count": error_count}
+
+def create_metrics(cache, sessions, jobs, admission):
+    """Registers the app's Prometheus metrics; returns (registry, {short name: metric}) for the request hooks."""
+    registry = MetricsRegistry()
+    instruments = {
+        "latency": registry.histogram("scorer_request_seconds", "Request latency by endpoint.", LATENCY_BUCKETS,
+                                      ["endpoint", "method", "status"]),
+        "errors": registry.counter("scorer_request_errors_total", "Responses with a 4xx or 5xx status.", ["endpoint", "status"]),
+        "words": registry.histogram("scorer_transcript_words", "Words per scored transcript.", SIZE_BUCKETS, ["endpoint"]),
+        "bytes": registry.histogram("scorer_transcript_bytes", "UTF-8 bytes per scored transcript.",
+                                    tuple(size * 8 for size in SIZE_BUCKETS), ["endpoint"]),
+        "stages": registry.histogram("scorer_stage_seconds", "Time per /score stage: cache lookup, analysis intermediates, scoring, serialization.",
+                                     LATENCY_BUCKETS, ["stage"]),
+        "estimated": registry.counter("scorer_estimated_results_total", "Results with a fallback estimate (grammar check timed out).")
+    }
+    registry.gauge("scorer_cache_requests_total", "Result cache lookups by outcome.",
+                   lambda: [((outcome,), cache.snapshot()[key]) for outcome, key in
+                            (("hit", "hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))],
+                   ["result"], kind="counter")
+    registry.gauge("scorer_cache_evictions_total", "Result cache LRU evictions.", lambda: cache.snapshot()["evictions"], kind="counter")
+    registry.gauge("scorer_cache_entries", "Results held in the in-memory cache.", lambda: cache.snapshot()["entries"])
+    registry.gauge("scorer_cache_bytes", "Serialized size of the in-memory cache.", lambda: cache.snapshot()["bytes"])
+    registry.gauge("scorer_cache_disk_rows", "Results held in the on-disk cache.", lambda: cache.snapshot()["disk_rows"])
+    registry.gauge("scorer_sessions_active", "Live scoring sessions.", lambda: sessions.snapshot()["active"])
+    registry.gauge("scorer_sessions_bytes", "Estimated memory of live sessions.", lambda: sessions.snapshot()["bytes"])
+    registry.gauge("scorer_jobs", "Jobs by status.",
+                   lambda: [((status,), count) for status, count in jobs.snapshot().items()
+                            if status in ("queued", "running", "done", "failed")], ["status"])
+    registry.gauge("scorer_jobs_rejected_total", "Jobs refused because the queue was full.",
+                   lambda: jobs.snapshot()["rejected"], kind="counter")
+    registry.gauge("scorer_admission_total", "Scoring requests admitted, or rejected by reason.",
+                   lambda: [((outcome,), admission.snapshot()[outcome]) for outcome in ("admitted",) + REASONS],
+                   ["outcome"], kind="counter")
+    registry.gauge("scorer_in_flight", "Requests currently scoring under the concurrency limit.",
+                   lambda: admission.concurrency.in_flight)
+    registry.gauge("scorer_batch_pool_workers", "Worker processes in started batch pools.",
+                   batch_pool_workers)
+    registry.gauge("scorer_grammar_pool_workers", "Grammar-check threads per process (0 = inline).", lambda: GRAMMAR_WORKERS)
+    return registry, instruments
+
+def create_app(config=None):
+    """Builds the Flask app. Settings come from the environment (config_from_env) with `config` overrides.
+
+    Flask is imported here rather than at module level, so importing this module (or scoring)
+    stays cheap for workers and the CLI.
+    """
+    from flask import Flask, g, request, jsonify, render_template_string
+    from flask.json.provider import JSONProvider
+
+    class FastJSONProvider(JSONProvider):
+        """Encodes jsonify() responses and decodes request.json with json_backend (orjson when installed)."""
+
+        def dumps(self, obj, **kwargs):
+            return json_dumps(obj).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return json_loads(s)
+
+        def response(self, *args, **kwargs):
+            obj = args[0] if len(args) == 1 else (args or kwargs)
+            return self._app.response_class(json_dumps(obj) + b"\n", mimetype="application/json")
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.update(config_from_env())
+    app.config.update(config or {})
+    # Werkzeug stops reading a body without Content-Length at this size; declared sizes are checked first
+    app.config["MAX_CONTENT_LENGTH"] = app.config["SCORER_MAX_BODY_BYTES"] or None
+    msgpack_codec = load_msgpack()
+
+    cache = ResultCache(RUBRIC_VERSION, max_bytes=app.config["SCORER_CACHE_MAX_BYTES"], db_path=app.config["SCORER_CACHE_DB"],
+                        db_max_rows=app.config["SCORER_CACHE_DB_MAX_ROWS"])
+    sessions = SessionStore(ttl_sec=app.config["SCORER_SESSION_TTL_SEC"], max_bytes=app.config["SCORER_SESSION_MAX_BYTES"])
+    batch_max_items = app.config["SCORER_BATCH_MAX_ITEMS"]
+    jobs = JobQueue(app.config["SCORER_JOBS_DB"], max_depth=app.config["SCORER_JOBS_MAX_DEPTH"],
+                    visibility_timeout_sec=app.config["SCORER_JOBS_VISIBILITY_SEC"],
+                    max_attempts=app.config["SCORER_JOBS_MAX_ATTEMPTS"], result_ttl_sec=app.config["SCORER_JOBS_RESULT_TTL_SEC"])
+    history = ScoreHistory(app.config["SCORER_HISTORY_DB"]) if app.config["SCORER_HISTORY_DB"] else None
+    admission = AdmissionControl(
+        max_body_bytes=app.config["SCORER_MAX_BODY_BYTES"], max_words=app.config["SCORER_MAX_WORDS"],
+        rate_per_sec=app.config["SCORER_RATE_PER_SEC"], burst=app.config["SCORER_RATE_BURST"],
+        max_in_flight=app.config["SCORER_MAX_IN_FLIGHT"], wait_sec=app.config["SCORER_ADMISSION_WAIT_SEC"],
+        retry_after_sec=app.config["SCORER_RETRY_AFTER_SEC"], max_job_words=app.config["SCORER_JOBS_MAX_WORDS"]
+    )
+    client_header = app.config["SCORER_CLIENT_HEADER"]
+    app.extensions["scorer"] = {"cache": cache, "sessions": sessions, "jobs": jobs, "history": history, "admission": admission}
+
+    def run_job(payload):
+        """Scores a queued job: one {transcript, duration_sec}, or a batch {items, ids}."""
+        compact = payload.get("compact", False)
+        if "items" in payload:
+            return batch_response(payload["ids"], score_batch(payload["items"], compact=compact))
+        return cached_analyze_transcript(cache, payload["transcript"], payload["duration_sec"], compact=compact,
+                                         pacing=payload.get("pacing"))
+
+    if app.config["SCORER_JOBS_WORKERS"] > 0:
+        app.extensions["scorer"]["job_workers"] = JobWorkers(jobs, run_job, workers=app.config["SCORER_JOBS_WORKERS"]).start()
+
+    registry, instruments = create_metrics(cache, sessions, jobs, admission) if app.config["SCORER_METRICS"] else (None, None)
+    if registry is not None:
+        app.extensions["scorer"]["metrics"] = registry
+
+        @app.before_request
+        def start_request_timer():
+            g.request_start = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            status = str(response.status_code)
+            instruments["latency"].observe(time.perf_counter() - g.request_start, endpoint, request.method, status)
+            if response.status_code >= 400:
+                instruments["errors"].inc(endpoint, status)
+            return response
+
+    def read_body():
+        """The request body, decoded from MessagePack, NDJSON or JSON according to its Content-Type.
+
+        An NDJSON body is an optional header object followed by one ASR word per line (see
+        pacing.read_ndjson_words); it becomes the header plus "words", an iterator that reads
+        the body as it is consumed. Raises PayloadTooLarge, before reading anything, if the
+        body is over SCORER_MAX_BODY_BYTES, UnsupportedBody for an unknown Content-Type and
+        ValueError for a body that does not decode.
+        """
+        from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+        admission.check_body_size(request.content_length)
+
+        def stream_lines():
+            try:
+                yield from request.stream
+            except RequestEntityTooLarge:
+                raise admission.body_too_large()
 
-# --- 4. HTML TEMPLATE (Frontend) ---
+        try:
+            if request.mimetype in NDJSON_MIMETYPES:
+                header, words = read_ndjson_words(stream_lines(), json_loads)
+                if not isinstance(header, dict) or 'words' in header:
+                    raise ValueError("An NDJSON body is an optional header object followed by one word object per line.")
+                return dict(header, words=words)
+            if request.mimetype in MSGPACK_MIMETYPES:
+                if msgpack_codec is None:
+                    raise UnsupportedBody("MessagePack bodies need the msgpack package on the server.")
+                return msgpack_codec[1](request.get_data())
+            return request.json
+        except RequestEntityTooLarge:
+            raise admission.body_too_large()
+        except UnsupportedMediaType:
+            raise UnsupportedBody(f"Unsupported Content-Type {request.mimetype or '(none)'}; send JSON, NDJSON or MessagePack.")
+        except BadRequest:
+            raise ValueError("Request body is not valid JSON.")
+
+    def rate_limited(cost=1):
+        """A 429 response if the client is over its rate limit (cost tokens), else None."""
+        if client_header:
+            # For a proxy header such as X-Forwarded-For, the first entry is the original client
+            client = request.headers.get(client_header, "").split(",")[0].strip() or request.remote_addr
+        else:
+            client = request.remote_addr
+        retry_after = admission.check_rate(client, cost)
+        if retry_after is None:
+            return None
+        response = jsonify({"error": "Rate limit exceeded; retry later."})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
+
+    def rejected(error):
+        """The response for a request refused while its body was read or validated: 413, 415 or 400."""
+        if isinstance(error, PayloadTooLarge):
+            status = 413
+        elif isinstance(error, UnsupportedBody):
+            status = 415
+        else:
+            status = 400
+        return jsonify({"error": str(error)}), status
+
+    def overloaded():
+        """The 503 response for a request shed by the concurrency limit."""
+        response = jsonify({"error": "Server is at capacity; retry later."})
+        response.headers["Retry-After"] = str(admission.retry_after_sec)
+        return response, 503
+
+    def check_batch_words(items, max_words=None):
+        for item in items:
+            if isinstance(item.get('transcript'), str):
+                admission.check_words(item['transcript'], max_words)
+            if isinstance(item.get('words'), list):
+                admission.check_word_count(len(item['words']), max_words)
+
+    def respond(payload, status=200):
+        """Encodes payload as MessagePack if the client's Accept header prefers it and msgpack is installed, else as JSON."""
+        mimetype = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES)
+        if msgpack_codec is not None and mimetype in MSGPACK_MIMETYPES:
+            response = app.response_class(msgpack_codec[0](payload), status=status, mimetype=mimetype)
+        else:
+            response = jsonify(payload)
+            response.status_code = status
+        response.vary.add("Accept")
+        return response
+
+    # The page has no template variables, so it is rendered and compressed once per app
+    with app.app_context():
+        page_variants = precompress_page(render_template_string(HTML_TEMPLATE))
+    page_etags = [etag.strip('"') for _, etag in page_variants.values()]
+    page_cache_control = f"public, max-age={app.config['SCORER_INDEX_MAX_AGE']}"
+
+    @app.route('/', methods=['GET'])
+    def index():
+        """Serves the single-page application (SPA) HTML, precompressed, with ETag revalidation."""
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in page_variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        body, etag = page_variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": page_cache_control, "Vary": "Accept-Encoding"}
+
+        if any(request.if_none_match.contains_weak(tag) for tag in page_etags):
+            return app.response_class(status=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return app.response_class(body, mimetype="text/html", headers=headers)
+
+    @app.route('/score', methods=['POST'])
+    def score_transcript():
+        """API endpoint for scoring the transcript.
+
+        With score history on, the optional cohort, class and date fields are stored with the
+        score, and the response gets its percentile rank within that cohort and class.
+        ?format=compact returns the compact result (ids and numbers instead of text, see GET /feedback).
+        With ASR word timestamps ("words": [{word, start, end}, ...] in JSON, or streamed as NDJSON),
+        the result also gets a pacing summary: a sliding-window WPM series and pause statistics.
+        Requests are subject to admission control (see admission.py): 413 for an oversized body or
+        transcript, 429 over the client's rate limit, 503 when the server is at capacity.
+        """
+        try:
+            limited = rate_limited()
+            if limited is not None:
+                return limited
+            try:
+                data = read_body()
+                transcript, duration_sec, pacing = validate_timed_input(data)
+                admission.check_words(transcript)
+                cohort, class_name, day = validate_history_labels(data)
+            except ValueError as e:
+                return rejected(e)
+
+            if not admission.enter():
+                return overloaded()
+            try:
+                return score_admitted(transcript, duration_sec, pacing, cohort, class_name, day)
+            finally:
+                admission.leave()
+
+        except Exception as e:
+            # Generic error handling
+            app.logger.exception("Scoring failed")
+            return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+    def score_admitted(transcript, duration_sec, pacing, cohort, class_name, day):
+        """Scores, records and encodes one validated /score request that holds a concurrency slot."""
+        profile = request.args.get('profile') == '1'
+        compact = request.args.get('format') == 'compact'
+        timings = {} if registry is not None or profile else None
+        result = cached_analyze_transcript(cache, transcript, duration_sec, timings, compact, pacing)
+        if history is not None:
+            start = time.perf_counter()
+            rank = history.record(result, cohort, class_name, day)
+            # A copy, since cached results are shared
+            result = dict(result, percentile={"rank": rank, "cohort": cohort, "class": class_name})
+            if timings is not None:
+                timings["history"] = time.perf_counter() - start
+
+        if timings is None:
+            return respond(result)
+        start = time.perf_counter()
+        response = respond(result)
+        timings["serialize"] = time.perf_counter() - start
+        if registry is not None:
+            instruments["words"].observe(result["total_word_count"], "/score")
+            instruments["bytes"].observe(len(transcript.encode("utf-8")), "/score")
+            for stage, seconds in timings.items():
+                instruments["stages"].observe(seconds, stage)
+            if has_estimates(result):
+                instruments["estimated"].inc()
+        if profile:
+            response = respond(dict(result, profile={
+                "cache_hit": "scoring" not in timings,
+                "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+                "total_ms": round(sum(timings.values()) * 1000, 3)
+            }))
+        return response
+
+    @app.route('/feedback', methods=['GET'])
+    def feedback():
+        """The feedback texts that compact results refer to by id, for the current rubric version."""
+        response = respond(dict(feedback_catalog(), rubric_version=RUBRIC_VERSION))
+        response.set_etag(RUBRIC_VERSION)
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config["SCORER_INDEX_MAX_AGE"]
+        return response.make_conditional(request)
+
+    @app.route('/cache/stats', methods=['GET'])
+    def cache_stats():
+        """Reports result cache hit/miss/eviction counters and memory and disk usage."""
+        return jsonify(dict(cache.snapshot(), rubric_version=RUBRIC_VERSION))
+
+    @app.route('/admission/stats', methods=['GET'])
+    def admission_stats():
+        """Reports admitted requests, rejections by reason and in-flight scoring, for tuning the limits."""
+        return jsonify(admission.snapshot())
+
+    @app.route('/history/aggregate', methods=['GET'])
+    def history_aggregate():
+        """Score count, mean, stddev, distribution and per-metric averages, filtered by cohort, class and date range."""
+        if history is None:
+            return jsonify({"error": "Score history is disabled."}), 404
+        try:
+            cohort, class_name, _ = validate_history_labels(request.args)
+            since, until = (parse_iso_day(request.args.get(name), name) for name in ('since', 'until'))
+        except ValueError as e:
+            return rejected(e)
+        return jsonify(history.aggregate(cohort, class_name, since, until))
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint (404 when SCORER_METRICS=0)."""
+        if registry is None:
+            return jsonify({"error": "Metrics are disabled."}), 404
+        return app.response_class(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    @app.route('/sessions', methods=['POST'])
+    def create_session():
+        """Starts a live scoring session for a transcript that will arrive in chunks."""
+        session = sessions.create()
+        return jsonify({"session_id": session.session_id, "ttl_sec": sessions.ttl_sec}), 201
+
+    @app.route('/sessions/<session_id>/append', methods=['POST'])
+    def append_session(session_id):
+        """Appends {text, elapsed_sec} to a live session and returns its updated score.
+
+        Admission control applies as for /score: the word limit is per chunk.
+        """
+        try:
+            limited = rate_limited()
+            if limited is not None:
+                return limited
+            try:
+                text, elapsed_sec = validate_session_append(read_body())
+                admission.check_words(text)
+            except ValueError as e:
+                return rejected(e)
+
+            if not admission.enter():
+                return overloaded()
+            try:
+                result = sessions.append(session_id, text, elapsed_sec)
+            finally:
+                admission.leave()
+            if result is None:
+                return jsonify({"error": "Session not found or expired."}), 404
+            return respond(result)
+
+        except Exception as e:
+            app.logger.exception("Request failed")
+            return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+    @app.route('/sessions/<session_id>', methods=['GET'])
+    def get_session(session_id):
+        """Returns the current score of a live session."""
+        result = sessions.score(session_id)
+        if result is None:
+            return jsonify({"error": "Session not found or expired."}), 404
+        return respond(result)
+
+    @app.route('/sessions/<session_id>', methods=['DELETE'])
+    def delete_session(session_id):
+        """Ends a live session."""
+        if not sessions.delete(session_id):
+            return jsonify({"error": "Session not found or expired."}), 404
+        return '', 204
+
+    @app.route('/score/batch', methods=['POST'])
+    def score_transcript_batch():
+        """API endpoint for scoring an array of {id, transcript, duration_sec} items in one request.
+
+        ?format=compact and admission control work as for /score; each item costs one rate-limit token.
+        """
+        try:
+            try:
+                items, ids = validate_batch_items(read_body(), batch_max_items)
+                check_batch_words(items)
+            except ValueError as e:
+                return rejected(e)
+            limited = rate_limited(len(items))
+            if limited is not None:
+                return limited
+
+            if not admission.enter():
+                return overloaded()
+            try:
+                outcomes = score_batch(items, compact=request.args.get('format') == 'compact')
+            finally:
+                admission.leave()
+            if registry is not None:
+                for item, outcome in zip(items, outcomes):
+                    if "error" not in outcome:
+                        instruments["words"].observe(outcome["total_word_count"], "/score/batch")
+                        instruments["bytes"].observe(len(str(item.get('transcript', '')).encode("utf-8")), "/score/batch")
+            return respond(batch_response(ids, outcomes))
+
+        except Exception as e:
+            app.logger.exception("Request failed")
+            return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+    @app.route('/jobs', methods=['POST'])
+    def create_job():
+        """Queues a transcript ({transcript, duration_sec}) or a batch ({items: [...]}) and returns its job id at once.
+
+        Body and rate limits apply as for /score and /score/batch. The word limit is SCORER_JOBS_MAX_WORDS
+        (none by default), since long transcripts are what the queue is for; queue depth replaces the concurrency limit.
+        """
+        try:
+            try:
+                data = read_body()
+                if isinstance(data, dict) and 'items' in data:
+                    items, ids = validate_batch_items(data, batch_max_items)
+                    check_batch_words(items, admission.max_job_words)
+                    payload = {"items": items, "ids": ids}
+                else:
+                    transcript, duration_sec, pacing = validate_timed_input(data)
+                    admission.check_words(transcript, admission.max_job_words)
+                    # The pacing summary is computed now, so the queue stores it instead of the word list
+                    payload = {"transcript": transcript, "duration_sec": duration_sec, "pacing": pacing}
+                payload["compact"] = request.args.get('format') == 'compact'
+            except ValueError as e:
+                return rejected(e)
+            limited = rate_limited(len(payload.get("items", ())) or 1)
+            if limited is not None:
+                return limited
+
+            try:
+                job_id = jobs.enqueue(payload)
+            except QueueFull as e:
+                response = jsonify({"error": str(e)})
+                response.headers["Retry-After"] = "5"
+                return response, 429
+            response = jsonify({"job_id": job_id, "status": "queued"})
+            response.headers["Location"] = f"/jobs/{job_id}"
+            return response, 202
+
+        except Exception as e:
+            app.logger.exception("Request failed")
+            return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Returns a job's status (queued, running, done or failed) with its result or error."""
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found or expired."}), 404
+        return respond(job)
+
+    return app
+
+
+# --- 2. HTML TEMPLATE (Frontend) ---
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -549,4 +816,4 @@ HTML_TEMPLATE = """
 """
 
 if __name__ == '__main__':        
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
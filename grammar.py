@@ -0,0 +1,134 @@
+"""Offline, rule-based grammar checker.
+
+Each rule is a regular expression compiled once, when this module is imported, and shared by
+every request. Rules look at one sentence at a time, so a transcript's error count is the sum
+over its sentences; live sessions rely on this to check sentences as they are completed.
+
+Rules: repeated words ("the the"), a/an before the wrong sound, subject-verb agreement with
+personal pronouns ("they was", "he don't"), capitalization (sentence starts and the pronoun
+"I") and run-on sentences. Capitalization errors are only counted for transcripts that contain
+any uppercase letters, so all-lowercase ASR output is not penalized for its casing.
+"""
+import re
+import time
+
+# Words that are correctly doubled often enough not to flag ("I had had enough", "that that")
+_REPEAT_OK = {"had", "that"}
+# Vowel-letter words that start with a consonant sound, and consonant-letter words that don't
+_A_OK_PREFIXES = ("one", "once", "uni", "use", "usu", "uti", "ure", "euro", "eu")
+_AN_OK_PREFIXES = ("hour", "honest", "honor", "honour", "heir")
+# After these the base form is correct ("does he have", "let it do")
+_AUXILIARIES = {
+    "do", "does", "did", "can", "could", "will", "would", "shall", "should", "may", "might", "must", "to",
+    "let", "lets", "make", "makes", "made", "help", "helps", "don't", "doesn't", "didn't", "can't", "couldn't",
+    "won't", "wouldn't", "shouldn't"
+}
+RUN_ON_WORDS = 40
+_BLOCK_SENTENCES = 256
+
+class GrammarIssue:
+    """One detected error: the rule that fired, its offsets within the checked text, and a message."""
+
+    __slots__ = ("rule", "start", "end", "message")
+
+    def __init__(self, rule, start, end, message):
+        self.rule = rule
+        self.start = start
+        self.end = end
+        self.message = message
+
+    def as_dict(self):
+        return {"rule": self.rule, "start": self.start, "end": self.end, "message": self.message}
+
+class GrammarChecker:
+    """Holds the compiled rules; check() and check_sentence() are safe to call from any thread."""
+
+    def __init__(self, run_on_words=RUN_ON_WORDS):
+        self.run_on_words = run_on_words
+        self._repeated = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+        self._a_vowel = re.compile(r"\ba\s+([aeiou][\w']*)", re.IGNORECASE)
+        self._an_consonant = re.compile(r"\ban\s+([b-df-hj-np-tv-z][\w']*)", re.IGNORECASE)
+        self._agreement = [
+            (re.compile(r"\b(i)\s+(is|are|has|does|doesn't)\b", re.IGNORECASE), None),
+            (re.compile(r"\b(you|we|they)\s+(is|am|was|wasn't|has|does|doesn't)\b", re.IGNORECASE), None),
+            (re.compile(r"\b(he|she|it)\s+(are|am|have|do|don't)\b", re.IGNORECASE), _AUXILIARIES),
+            (re.compile(r"\b(these|those)\s+(is|was|has)\b", re.IGNORECASE), None)
+        ]
+        self._previous_word = re.compile(r"([\w']+)\s+$")
+        self._lowercase_i = re.compile(r"(?<![\w'.])i(?=[\s,;:!?']|$)")
+        self._word = re.compile(r"\w+")
+        self._clause_break = re.compile(r"[,;:—]| - ")
+
+    def check(self, text, sentence_spans, deadline=None):
+        """Returns the issues in text, or None if time.monotonic() passes deadline first.
+
+        sentence_spans are (start, end) offsets of the sentences in text (as produced by
+        scoring.TranscriptContext.sentence_spans); issue offsets are relative to text.
+        Sentences are checked in blocks of _BLOCK_SENTENCES, with the deadline checked between blocks.
+        """
+        cased = has_uppercase(text)
+        issues = []
+        for i in range(0, len(sentence_spans), _BLOCK_SENTENCES):
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            block = sentence_spans[i:i + _BLOCK_SENTENCES]
+            offset = block[0][0]
+            for issue in self.check_sentences(text[offset:block[-1][1]], [(start - offset, end - offset) for start, end in block]):
+                if issue.rule == "capitalization" and not cased:
+                    continue
+                issue.start += offset
+                issue.end += offset
+                issues.append(issue)
+        return issues
+
+    def check_sentences(self, text, sentence_spans):
+        """Returns every issue in text, which holds whole sentences at sentence_spans separated by whitespace.
+
+        Includes capitalization issues (see check). The word-level rules never match across a
+        sentence boundary, so they run once over the whole text rather than per sentence.
+        """
+        issues = []
+        for m in self._repeated.finditer(text):
+            if m.group(1).lower() not in _REPEAT_OK and not m.group(1).isdigit():
+                issues.append(GrammarIssue("repeated_word", m.start(), m.end(), f"Repeated word \"{m.group(1)}\"."))
+        for m in self._a_vowel.finditer(text):
+            word = m.group(1)
+            if not word.lower().startswith(_A_OK_PREFIXES) and not word.isupper():
+                issues.append(GrammarIssue("article", m.start(), m.end(), f"Use \"an\" before \"{word}\"."))
+        for m in self._an_consonant.finditer(text):
+            word = m.group(1)
+            if not word.lower().startswith(_AN_OK_PREFIXES) and not word.isupper():
+                issues.append(GrammarIssue("article", m.start(), m.end(), f"Use \"a\" before \"{word}\"."))
+        for pattern, auxiliaries in self._agreement:
+            for m in pattern.finditer(text):
+                if auxiliaries is not None:
+                    previous = self._previous_word.search(text, max(0, m.start() - 20), m.start())
+                    if previous and previous.group(1).lower() in auxiliaries:
+                        continue
+                issues.append(GrammarIssue("agreement", m.start(), m.end(), f"\"{m.group()}\" does not agree."))
+        lowercase_starts = set()
+        for start, end in sentence_spans:
+            if text[start:start + 1].islower():
+                lowercase_starts.add(start)
+                issues.append(GrammarIssue("capitalization", start, start + 1, "Start sentences with a capital letter."))
+            # A sentence needs at least two characters per word to be a run-on
+            if end - start > 2 * self.run_on_words:
+                sentence = text[start:end]
+                words = self._word.findall(sentence)
+                if len(words) > self.run_on_words and not self._clause_break.search(sentence):
+                    issues.append(GrammarIssue("run_on", start, end,
+                                               f"Run-on sentence ({len(words)} words without a break); split it up."))
+        for m in self._lowercase_i.finditer(text):
+            if m.start() not in lowercase_starts:
+                issues.append(GrammarIssue("capitalization", m.start(), m.end(), "Capitalize the pronoun \"I\"."))
+        return issues
+
+    def check_sentence(self, sentence):
+        """Returns every issue in one sentence, including capitalization issues (see check)."""
+        return self.check_sentences(sentence, [(0, len(sentence))])
+
+def has_uppercase(text):
+    """True if text contains any cased letter that lowercasing changes."""
+    return text.lower() != text
+
+GRAMMAR_CHECKER = GrammarChecker()
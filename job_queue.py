@@ -0,0 +1,205 @@
+"""SQLite-backed job queue for asynchronous scoring (POST /jobs).
+
+Jobs are rows in one table. A worker claims the oldest queued job by setting its lease; a job
+whose lease expires (its worker died or hung past the visibility timeout) becomes claimable
+again. A failed attempt is retried until max_attempts is reached, then the job is marked
+failed. Finished jobs keep their result for result_ttl_sec and are then deleted by cleanup().
+enqueue() raises QueueFull once queued + running jobs reach max_depth.
+
+With a file path the queue survives restarts and can be shared by several server processes;
+a ":memory:" database lives only as long as the process. The server uses a file by default
+(see SCORER_JOBS_DB in completecode.config_from_env).
+"""
+import json
+import os
+import threading
+import time
+
+class QueueFull(Exception):
+    """Raised by enqueue() when the queue is at max_depth."""
+
+class JobQueue:
+    """Persistent queue of JSON payloads with leases, retries and result expiry."""
+
+    def __init__(self, db_path=":memory:", max_depth=1000, visibility_timeout_sec=300, max_attempts=3, result_ttl_sec=3600):
+        import sqlite3
+        self.max_depth = max_depth
+        self.visibility_timeout_sec = visibility_timeout_sec
+        self.max_attempts = max_attempts
+        self.result_ttl_sec = result_ttl_sec
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL, lease_expires REAL, finished REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created)")
+        self.stats = {"enqueued": 0, "rejected": 0, "completed": 0, "retried": 0, "failed": 0, "expired": 0}
+
+    def _transaction(self, work):
+        # BEGIN IMMEDIATE takes the write lock up front, so check-then-update is atomic across processes
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def enqueue(self, payload):
+        """Adds a job and returns its id; raises QueueFull if queued + running jobs are at max_depth."""
+        job_id = os.urandom(16).hex()
+
+        def work(db):
+            depth = db.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+            if depth >= self.max_depth:
+                self.stats["rejected"] += 1
+                return False
+            db.execute("INSERT INTO jobs (id, status, payload, created) VALUES (?, 'queued', ?, ?)",
+                       (job_id, json.dumps(payload), time.time()))
+            self.stats["enqueued"] += 1
+            return True
+
+        if not self._transaction(work):
+            raise QueueFull(f"Job queue is full ({self.max_depth} jobs waiting or running).")
+        return job_id
+
+    def claim(self):
+        """Leases the oldest claimable job; returns (job_id, payload, attempt number) or None if there is none."""
+        def work(db):
+            now = time.time()
+            while True:
+                row = db.execute(
+                    "SELECT id, payload, attempts FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_expires < ?) ORDER BY created LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, payload, attempts = row
+                if attempts >= self.max_attempts:
+                    # Its last lease expired without a result
+                    db.execute("UPDATE jobs SET status = 'failed', error = ?, finished = ?, lease_expires = NULL WHERE id = ?",
+                               ("Job timed out.", now, job_id))
+                    self.stats["failed"] += 1
+                    continue
+                db.execute("UPDATE jobs SET status = 'running', attempts = ?, lease_expires = ? WHERE id = ?",
+                           (attempts + 1, now + self.visibility_timeout_sec, job_id))
+                return job_id, json.loads(payload), attempts + 1
+
+        return self._transaction(work)
+
+    def complete(self, job_id, attempt, result):
+        """Stores the result of a claimed attempt and marks the job done.
+
+        Ignored if the job has since been claimed again (its lease expired), so a slow worker
+        cannot overwrite a newer attempt.
+        """
+        def work(db):
+            updated = db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished = ?, lease_expires = NULL "
+                "WHERE id = ? AND status = 'running' AND attempts = ?", (json.dumps(result), time.time(), job_id, attempt)
+            ).rowcount
+            self.stats["completed"] += updated
+        self._transaction(work)
+
+    def fail(self, job_id, attempt, error):
+        """Records a failed attempt: the job is queued again, or marked failed after max_attempts."""
+        def work(db):
+            row = db.execute("SELECT attempts FROM jobs WHERE id = ? AND status = 'running' AND attempts = ?",
+                             (job_id, attempt)).fetchone()
+            if row is None:
+                return
+            if row[0] < self.max_attempts:
+                db.execute("UPDATE jobs SET status = 'queued', error = ?, lease_expires = NULL WHERE id = ?", (error, job_id))
+                self.stats["retried"] += 1
+            else:
+                db.execute("UPDATE jobs SET status = 'failed', error = ?, finished = ?, lease_expires = NULL WHERE id = ?",
+                           (error, time.time(), job_id))
+                self.stats["failed"] += 1
+
+        self._transaction(work)
+
+    def get(self, job_id):
+        """Returns the job's status dict, or None if it does not exist or has expired."""
+        with self._lock:
+            row = self._db.execute("SELECT status, result, error, attempts, created, finished FROM jobs WHERE id = ?",
+                                   (job_id,)).fetchone()
+        if row is None:
+            return None
+        status, result, error, attempts, created, finished = row
+        job = {"job_id": job_id, "status": status, "attempts": attempts, "created": created, "finished": finished}
+        if status == "done":
+            job["result"] = json.loads(result)
+        elif status == "failed":
+            job["error"] = error
+        return job
+
+    def cleanup(self):
+        """Deletes finished jobs older than result_ttl_sec; returns how many were deleted."""
+        def work(db):
+            deleted = db.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?",
+                                 (time.time() - self.result_ttl_sec,)).rowcount
+            self.stats["expired"] += deleted
+            return deleted
+        return self._transaction(work)
+
+    def snapshot(self):
+        """Returns the counters plus the number of jobs in each status."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return dict(self.stats, **{status: counts.get(status, 0) for status in ("queued", "running", "done", "failed")})
+
+class JobWorkers:
+    """Threads that claim jobs and run handler(payload); the handler's return value becomes the job result.
+
+    An exception from handler counts as a failed attempt (see JobQueue.fail). Expired results
+    are cleaned up every cleanup_interval_sec.
+    """
+
+    def __init__(self, queue, handler, workers=2, poll_interval_sec=0.2, cleanup_interval_sec=60):
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval_sec = poll_interval_sec
+        self.cleanup_interval_sec = cleanup_interval_sec
+        self._stop = threading.Event()
+        self._next_cleanup = 0.0
+        self._cleanup_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True) for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._maybe_cleanup()
+            claimed = self.queue.claim()
+            if claimed is None:
+                self._stop.wait(self.poll_interval_sec)
+                continue
+            job_id, payload, attempt = claimed
+            try:
+                result = self.handler(payload)
+            except Exception as e:
+                self.queue.fail(job_id, attempt, f"{type(e).__name__}: {e}")
+            else:
+                self.queue.complete(job_id, attempt, result)
+
+    def _maybe_cleanup(self):
+        now = time.monotonic()
+        with self._cleanup_lock:
+            if now < self._next_cleanup:
+                return
+            self._next_cleanup = now + self.cleanup_interval_sec
+        self.queue.cleanup()
@@ -0,0 +1,55 @@
+"""JSON and MessagePack encoding for API requests and responses.
+
+The JSON backend is chosen once at startup with SCORER_JSON_BACKEND: "orjson" (several times
+faster, needs the orjson package), "json" (the standard library) or "auto" (the default:
+orjson when installed). Both write compact JSON with sorted keys, as Flask's own encoder does;
+the standard-library backend also escapes non-ASCII characters, orjson writes them as UTF-8.
+
+MessagePack is available when the msgpack package is installed (see load_msgpack).
+"""
+import json
+import os
+import warnings
+
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl") # one JSON value per line, read as a stream
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+def resolve_json_backend(backend):
+    """Returns (backend name, dumps(obj) -> bytes, loads(bytes or str) -> obj).
+
+    An unavailable orjson falls back to the standard library: silently for "auto", with a
+    warning when "orjson" was asked for.
+    """
+    if backend not in ("auto", "orjson", "json"):
+        raise ValueError(f"Unknown JSON backend: {backend!r} (expected 'auto', 'orjson' or 'json').")
+    if backend != "json":
+        try:
+            import orjson
+        except ImportError:
+            if backend == "orjson":
+                warnings.warn("orjson is not installed; using the standard json module.", RuntimeWarning, stacklevel=2)
+        else:
+            def orjson_dumps(obj):
+                return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+            return "orjson", orjson_dumps, orjson.loads
+    return "json", _stdlib_dumps, json.loads
+
+JSON_BACKEND, json_dumps, json_loads = resolve_json_backend(os.environ.get("SCORER_JSON_BACKEND", "auto"))
+
+def load_msgpack():
+    """Returns (packb, unpackb) if the msgpack package is installed, else None."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+
+    def packb(obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def unpackb(data):
+        return msgpack.unpackb(data, raw=False)
+    return packb, unpackb
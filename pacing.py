@@ -0,0 +1,198 @@
+"""Pacing analysis from ASR word timestamps: a sliding-window WPM series and pause statistics.
+
+Words arrive in time order as {"word": text, "start": sec, "end": sec} ("text" is accepted
+for "word"). PacingAnalyzer makes one pass over them. A window of WINDOW_SEC seconds slides
+forward STEP_SEC at a time from the first word. A word counts in a window if it starts inside
+it. Each word start enters and leaves a deque once, so the pass is linear in words plus
+windows. Memory grows only with the words in one window and the length of the series, never
+with the whole word list. A gap of PAUSE_SEC or more between one word's end and the next
+word's start is a pause, and one of LONG_PAUSE_SEC or more is a long pause.
+
+The overall speech rate is still scored with the rubric buckets. The pacing summary adds how
+much the rate varied, and notes (see pacing_notes) that are appended to the Speech Rate feedback.
+"""
+import json
+import math
+from collections import deque
+
+WINDOW_SEC = 20.0
+STEP_SEC = 5.0
+PAUSE_SEC = 0.25
+LONG_PAUSE_SEC = 1.0
+UNEVEN_PACE_CV = 0.25 # window WPM stddev / mean above which the pace counts as uneven
+FREQUENT_LONG_PAUSES_PER_MIN = 2.0
+
+# Indexed by the ids pacing_notes() returns
+PACING_NOTES = (
+    "Your pace was steady throughout.",
+    "Your pace varied a lot from one part of the talk to another; aim for a steadier rate.",
+    "There were several long pauses; try to keep the talk flowing."
+)
+
+def parse_word(entry, index):
+    """Returns (text, start, end) for one ASR word dict; raises ValueError naming the word's index."""
+    if not isinstance(entry, dict):
+        raise ValueError(f"Word {index} must be an object with word, start and end.")
+    text = entry.get("word", entry.get("text"))
+    if not isinstance(text, str):
+        raise ValueError(f"Word {index} needs its text in \"word\".")
+    start, end = entry.get("start"), entry.get("end")
+    for value in (start, end):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Word {index} needs numeric start and end times in seconds.")
+    if start < 0 or end < start:
+        raise ValueError(f"Word {index} must have 0 <= start <= end.")
+    return text, float(start), float(end)
+
+class PacingAnalyzer:
+    """Accumulates word timings in time order; summary() returns the WPM series and pause statistics."""
+
+    def __init__(self, window_sec=WINDOW_SEC, step_sec=STEP_SEC, pause_sec=PAUSE_SEC, long_pause_sec=LONG_PAUSE_SEC):
+        if window_sec <= 0 or step_sec <= 0:
+            raise ValueError("Pacing window and step must be positive.")
+        self.window_sec = window_sec
+        self.step_sec = step_sec
+        self.pause_sec = pause_sec
+        self.long_pause_sec = long_pause_sec
+        self.word_count = 0
+        self.first_start = None
+        self.last_start = None
+        self.last_end = None
+        self.series = [] # [window start, WPM]
+        self._starts = deque() # word starts at or after the next window's start
+        self._windows = 0 # windows emitted; window k starts at first_start + k * step_sec
+        self.pause_count = self.long_pause_count = 0
+        self.pause_total_sec = self.pause_max_sec = 0.0
+
+    def add(self, start, end):
+        """Adds one word; raises ValueError if it starts before the previous word."""
+        if self.first_start is None:
+            self.first_start = start
+        elif start < self.last_start:
+            raise ValueError(f"Word {self.word_count} starts before the word preceding it; words must be in time order.")
+        else:
+            gap = start - self.last_end
+            if gap >= self.pause_sec:
+                self.pause_count += 1
+                self.pause_total_sec += gap
+                self.pause_max_sec = max(self.pause_max_sec, gap)
+                if gap >= self.long_pause_sec:
+                    self.long_pause_count += 1
+        # Every window that ends at or before this word is complete
+        while self._window_start(self._windows) + self.window_sec <= start:
+            self._emit_window()
+        self._starts.append(start)
+        self.last_start = start
+        self.last_end = end if self.last_end is None else max(self.last_end, end)
+        self.word_count += 1
+
+    def _window_start(self, index):
+        return self.first_start + index * self.step_sec
+
+    def _emit_window(self):
+        # Called before a word starting at or after this window's end is added, so every start
+        # left in the deque after dropping the earlier ones falls inside the window
+        window_start = self._window_start(self._windows)
+        while self._starts and self._starts[0] < window_start:
+            self._starts.popleft()
+        self.series.append([round(window_start, 2), round(len(self._starts) * 60 / self.window_sec, 1)])
+        self._windows += 1
+
+    def summary(self):
+        """The pacing summary: series, WPM spread, articulation rate and pauses (None if no words were added)."""
+        if self.first_start is None:
+            return None
+        series = list(self.series)
+        speech_sec = self.last_end - self.first_start
+        # Finish the windows that fit before the last word ends, without disturbing the running state
+        index, starts = self._windows, list(self._starts)
+        while self._window_start(index) + self.window_sec <= self.last_end:
+            window_start = self._window_start(index)
+            count = sum(1 for start in starts if window_start <= start < window_start + self.window_sec)
+            series.append([round(window_start, 2), round(count * 60 / self.window_sec, 1)])
+            index += 1
+        if not series:
+            # Shorter than one window: a single window over the whole speech
+            rate = self.word_count * 60 / speech_sec if speech_sec > 0 else 0.0
+            series.append([round(self.first_start, 2), round(rate, 1)])
+
+        rates = [wpm for _, wpm in series]
+        mean = sum(rates) / len(rates)
+        stddev = math.sqrt(sum((wpm - mean) ** 2 for wpm in rates) / len(rates))
+        speaking_sec = speech_sec - self.pause_total_sec
+        minutes = speech_sec / 60
+        return {
+            "word_count": self.word_count,
+            "speech_sec": round(speech_sec, 3),
+            "window_sec": self.window_sec,
+            "step_sec": self.step_sec,
+            "wpm_series": series,
+            "wpm_mean": round(mean, 1),
+            "wpm_stddev": round(stddev, 1),
+            "wpm_min": min(rates),
+            "wpm_max": max(rates),
+            "wpm_cv": round(stddev / mean, 3) if mean else 0.0,
+            "articulation_wpm": round(self.word_count * 60 / speaking_sec, 1) if speaking_sec > 0 else 0.0,
+            "pauses": {
+                "count": self.pause_count,
+                "long_count": self.long_pause_count,
+                "total_sec": round(self.pause_total_sec, 3),
+                "mean_sec": round(self.pause_total_sec / self.pause_count, 3) if self.pause_count else 0.0,
+                "max_sec": round(self.pause_max_sec, 3),
+                "per_minute": round(self.pause_count / minutes, 2) if minutes > 0 else 0.0,
+                "long_per_minute": round(self.long_pause_count / minutes, 2) if minutes > 0 else 0.0,
+                "threshold_sec": self.pause_sec,
+                "long_threshold_sec": self.long_pause_sec
+            }
+        }
+
+def pacing_notes(summary):
+    """Ids into PACING_NOTES for a pacing summary: uneven pace and/or frequent long pauses, else steady."""
+    notes = []
+    if len(summary["wpm_series"]) > 1 and summary["wpm_cv"] > UNEVEN_PACE_CV:
+        notes.append(1)
+    if summary["pauses"]["long_per_minute"] > FREQUENT_LONG_PAUSES_PER_MIN:
+        notes.append(2)
+    return notes or [0]
+
+def read_timed_words(words, analyzer=None):
+    """Reads an iterable of ASR word dicts in one pass; returns (transcript text, PacingAnalyzer).
+
+    words may be a generator (see read_ndjson_words), so long recordings are never held as a list of dicts.
+    """
+    analyzer = PacingAnalyzer() if analyzer is None else analyzer
+    parts = []
+    for index, entry in enumerate(words):
+        text, start, end = parse_word(entry, index)
+        analyzer.add(start, end)
+        parts.append(text)
+    return " ".join(parts), analyzer
+
+def read_ndjson_words(lines, loads=json.loads):
+    """Splits NDJSON lines into (header dict, iterator of word dicts), reading only the first line up front.
+
+    The first line is a header (e.g. {"duration_sec": 312.5}) if it has no "start"; blank lines are skipped.
+    """
+    lines = iter(lines)
+
+    def parse(number, line):
+        try:
+            return loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number} is not valid JSON: {e}")
+
+    header, first, number = {}, None, 0
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            first = parse(number, line)
+            break
+    if isinstance(first, dict) and "start" not in first:
+        header, first = first, None
+
+    def words():
+        if first is not None:
+            yield first
+        for line_number, line in enumerate(lines, number + 1):
+            if line.strip():
+                yield parse(line_number, line)
+    return header, words()
@@ -0,0 +1,169 @@
+"""Re-scores stored raw metrics against the current rubric or a rubric file, without re-analyzing text.
+
+Raw metrics (word count, duration, type count, filler count, key-word hits, salutation/flow
+flags, grammar error rate) do not depend on the rubric, so they are extracted once and packed
+into columns:
+
+    python score_cli.py archive.jsonl --raw -o raw.jsonl
+    python rescore_cli.py raw.jsonl --pack raw.npz
+    python rescore_cli.py raw.npz --rubric rubric.json -o scores.npz
+
+Records are scored with the NumPy engine in batch_metrics. Raw JSONL input works too, but
+parsing it costs far more than the scoring. JSONL output lines are
+{"id": ..., "final_score": ..., "scores": {metric: score}}, plus "estimated": true when the
+grammar check had timed out; with --full (JSONL input only) they are {"id": ..., "result": {...}}
+as score_cli.py writes, without highlights. An .npz output holds ids, final_score and one
+score array per metric. Error lines, and records extracted under a different
+RAW_METRICS_VERSION (the tokenizer, phrase lists or analysis code changed), are reported as
+{"id": ..., "error": "..."} and left out of .npz files.
+"""
+import argparse
+import io
+import json
+import sys
+from itertools import islice
+
+import numpy as np
+
+from batch_metrics import load_raw, raw_columns, rescore, save_raw, score_arrays
+from scoring import COMPILED_RUBRIC, ENABLED_METRICS, RAW_METRICS_VERSION, CompiledRubric
+
+def load_rubric(path):
+    """Compiles a rubric JSON file shaped like RUBRIC; raises ValueError if it lacks an enabled metric."""
+    with open(path, encoding="utf-8") as f:
+        rubric = CompiledRubric(json.load(f))
+    missing = [metric.name for metric in ENABLED_METRICS if metric.name not in rubric.specs]
+    if missing:
+        raise ValueError(f"Rubric {path} has no entry for: {', '.join(missing)}")
+    return rubric
+
+def read_raw_blocks(lines, block_size=100000, check_version=True):
+    """Yields (outputs, rows, positions) per block of raw JSONL lines.
+
+    outputs has one {"id": ...} dict per record, already holding "error" for records that
+    cannot be scored; rows are the scorable raw dicts and positions their indices in outputs.
+    """
+    lines = iter(lines)
+    while True:
+        block = list(islice(lines, block_size))
+        if not block:
+            return
+        outputs, rows, positions = [], [], []
+        for line in block:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                outputs.append({"id": None, "error": f"Invalid JSON: {e}"})
+                continue
+            if "raw" not in record:
+                outputs.append({"id": record.get("id"), "error": record.get("error", "Record has no raw metrics.")})
+            elif check_version and record.get("raw_version") != RAW_METRICS_VERSION:
+                outputs.append({"id": record.get("id"), "error": "Raw metrics were extracted by a different analysis version."})
+            else:
+                positions.append(len(outputs))
+                rows.append(record["raw"])
+                outputs.append({"id": record.get("id")})
+        yield outputs, rows, positions
+
+def compact_outputs(ids, scored, timed_out=None):
+    """Yields one compact output dict per scored row."""
+    totals = scored["total_score"].tolist()
+    metric_scores = {name: scores.tolist() for name, scores in scored["scores"].items()}
+    timed_out = timed_out.tolist() if timed_out is not None else None
+    for i, record_id in enumerate(ids):
+        output = {"id": record_id, "final_score": totals[i], "scores": {name: scores[i] for name, scores in metric_scores.items()}}
+        if timed_out is not None and timed_out[i]:
+            output["estimated"] = True
+        yield output
+
+def rescore_lines(lines, rubric, full=False, block_size=100000, check_version=True):
+    """Yields one output dict per raw JSONL line, scoring blocks of block_size records at once."""
+    for outputs, rows, positions in read_raw_blocks(lines, block_size, check_version):
+        if rows and full:
+            for position, result in zip(positions, rescore(rows, rubric, full=True)):
+                outputs[position]["result"] = result
+        elif rows:
+            timed_out = np.array([row.get("grammar_timed_out", False) for row in rows])
+            ids = [outputs[position]["id"] for position in positions]
+            for position, output in zip(positions, compact_outputs(ids, rescore(rows, rubric), timed_out)):
+                outputs[position] = output
+        yield from outputs
+
+def pack_lines(lines, path, block_size=100000, check_version=True):
+    """Packs raw JSONL lines into an .npz file (see batch_metrics.save_raw); returns (packed, skipped)."""
+    ids, blocks, skipped = [], [], 0
+    for outputs, rows, positions in read_raw_blocks(lines, block_size, check_version):
+        skipped += len(outputs) - len(rows)
+        if rows:
+            ids.extend(outputs[position]["id"] for position in positions)
+            blocks.append(raw_columns(rows))
+    columns = {field: np.concatenate([block[field] for block in blocks]) for field in blocks[0]} if blocks else raw_columns([])
+    save_raw(path, ids, columns, RAW_METRICS_VERSION)
+    return len(ids), skipped
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score raw metrics from score_cli.py --raw, writing JSONL or .npz scores.")
+    parser.add_argument("input", help="Raw-metrics JSONL file, '-' for stdin, or an .npz file from --pack.")
+    parser.add_argument("-o", "--output", help="Output JSONL or .npz file (default: JSONL on stdout).")
+    parser.add_argument("--rubric", help="Rubric JSON file shaped like scoring.RUBRIC (default: the built-in rubric).")
+    parser.add_argument("--full", action="store_true", help="Write full result dicts instead of compact scores.")
+    parser.add_argument("--pack", metavar="NPZ", help="Only pack the raw JSONL input into this .npz file for fast re-scoring.")
+    parser.add_argument("--block-size", type=int, default=100000, help="JSONL records parsed per batch (default: 100000).")
+    parser.add_argument("--ignore-version", action="store_true", help="Accept records from other RAW_METRICS_VERSIONs too.")
+    args = parser.parse_args(argv)
+
+    npz_input = args.input.lower().endswith(".npz")
+    npz_output = bool(args.output) and args.output.lower().endswith(".npz")
+    if npz_input and args.pack:
+        parser.error("--pack takes raw JSONL input.")
+    if args.full and (npz_input or npz_output):
+        parser.error("--full needs JSONL input and output.")
+    if npz_output and not npz_input:
+        parser.error(".npz output needs .npz input; run --pack first.")
+    try:
+        rubric = load_rubric(args.rubric) if args.rubric else COMPILED_RUBRIC
+    except ValueError as e:
+        parser.error(str(e))
+
+    if npz_input:
+        ids, arrays, raw_version = load_raw(args.input)
+        if raw_version != RAW_METRICS_VERSION and not args.ignore_version:
+            sys.exit(f"{args.input} was extracted under raw metrics version {raw_version}, not {RAW_METRICS_VERSION}.")
+        scored = score_arrays(arrays, rubric)
+        if npz_output:
+            np.savez(args.output, ids=ids, final_score=scored["total_score"], **scored["scores"])
+            print(f"Re-scored {len(ids)} records.", file=sys.stderr)
+            return
+
+    in_stream = None if npz_input else sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    if args.pack:
+        try:
+            packed, skipped = pack_lines(in_stream, args.pack, args.block_size, not args.ignore_version)
+        finally:
+            in_stream.close()
+        print(f"Packed {packed} records ({skipped} skipped).", file=sys.stderr)
+        return
+
+    out_stream = open(args.output, "w", encoding="utf-8") if args.output else io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    written = errors = 0
+    try:
+        if npz_input:
+            outputs = compact_outputs(ids.tolist(), scored, arrays.get("grammar_timed_out"))
+        else:
+            outputs = rescore_lines(in_stream, rubric, args.full, args.block_size, not args.ignore_version)
+        for output in outputs:
+            out_stream.write(json.dumps(output) + "\n")
+            written += 1
+            errors += "error" in output
+    finally:
+        out_stream.flush()
+        if in_stream is not None and args.input != "-":
+            in_stream.close()
+        if args.output:
+            out_stream.close()
+    print(f"Re-scored {written - errors} records ({errors} errors).", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
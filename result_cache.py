@@ -0,0 +1,131 @@
+"""Content-addressed cache for scoring results.
+
+Two tiers: an in-process LRU bounded by the serialized size of its entries, and an optional
+SQLite file that survives restarts. Keys are computed by the caller (see cache_key); every
+entry also records the rubric version it was scored under, and disk entries from any other
+version are deleted when the database is opened. The disk tier is bounded by row count,
+dropping the oldest rows first.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+def cache_key(transcript, duration_sec, rubric_version):
+    """Hashes the (already normalized) transcript, duration and rubric version into a cache key."""
+    digest = hashlib.sha256()
+    digest.update(rubric_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(repr(float(duration_sec)).encode("ascii"))
+    digest.update(b"\0")
+    digest.update(transcript.encode("utf-8"))
+    return digest.hexdigest()
+
+class ResultCache:
+    """LRU of result dicts bounded by bytes, with an optional SQLite second tier.
+
+    Cached results are shared between callers and must be treated as read-only. The disk tier
+    has its own lock, so a disk read or write never blocks lookups that hit the memory tier.
+    It keeps at most db_max_rows rows (0 = no bound): once an insert takes it past the bound,
+    the oldest rows are deleted down to 90% of it.
+    """
+
+    def __init__(self, rubric_version, max_bytes=64 * 1024 * 1024, db_path=None, db_max_rows=100000):
+        self.rubric_version = rubric_version
+        self.max_bytes = max_bytes
+        self.db_max_rows = db_max_rows
+        self._entries = OrderedDict() # key -> (result, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._db_rows = 0 # rows on disk; counts a replaced row twice until the next prune recounts
+        if db_path:
+            import sqlite3
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, rubric_version TEXT NOT NULL, result TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created)")
+                self._db.execute("DELETE FROM results WHERE rubric_version != ?", (rubric_version,))
+                self._db_rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                self._prune()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0 or self._db is not None
+
+    def get(self, key):
+        """Returns the cached result for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+        row = None
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT result FROM results WHERE key = ? AND rubric_version = ?", (key, self.rubric_version)
+                ).fetchone()
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            result = json.loads(row[0])
+            self._remember(key, result, len(row[0]))
+            return result
+
+    def put(self, key, result):
+        """Stores result under key in both tiers."""
+        encoded = json.dumps(result)
+        with self._lock:
+            self._remember(key, result, len(encoded))
+        if self._db is not None:
+            with self._db_lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, rubric_version, result, created) VALUES (?, ?, ?, ?)",
+                    (key, self.rubric_version, encoded, time.time())
+                )
+                self._db_rows += 1
+                self._prune()
+
+    def snapshot(self):
+        """Returns the counters plus current memory and disk usage."""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes,
+                         disk=self._db is not None)
+        return dict(stats, disk_rows=self._db_rows, disk_max_rows=self.db_max_rows)
+
+    def _prune(self):
+        # Caller holds the disk lock, inside a transaction
+        if self.db_max_rows <= 0 or self._db_rows <= self.db_max_rows:
+            return
+        self._db_rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if self._db_rows <= self.db_max_rows:
+            return
+        excess = self._db_rows - self.db_max_rows * 9 // 10
+        self._db.execute("DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY created LIMIT ?)", (excess,))
+        self._db_rows -= excess
+        with self._lock:
+            self.stats["disk_evictions"] += excess
+
+    def _remember(self, key, result, size):
+        # Caller holds the lock
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats["evictions"] += 1
@@ -0,0 +1,152 @@
+"""Command-line scorer for JSONL/CSV transcript corpora.
+
+Streams records through analyze_transcript and writes one JSONL result per record, in input
+order, without holding the corpus in memory:
+
+    python score_cli.py transcripts.jsonl -o results.jsonl --workers 4 --checkpoint run.ckpt
+    cat transcripts.csv | python score_cli.py - --format csv > results.jsonl
+
+Each input record needs a transcript and a duration (field names configurable); the id
+defaults to the record's 1-based position. A JSONL record may carry ASR word timestamps
+(--words-field, default "words") instead of or alongside the transcript; its result then
+includes a pacing summary (see pacing.py). Each output line is {"id": ..., "result": {...}} or
+{"id": ..., "error": "..."}. With --raw it is {"id": ..., "raw": {...}, "raw_version": ...}
+instead: the rubric-independent raw metrics, which rescore_cli.py scores against any rubric.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from itertools import islice
+
+from scoring import RAW_METRICS_VERSION, score_batch
+
+def read_records(stream, fmt):
+    """Yields one dict per input record; unparseable JSONL lines yield {"_error": ...}."""
+    if fmt == "csv":
+        csv.field_size_limit(sys.maxsize)
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield {"_error": f"Invalid JSON: {e}"}
+            continue
+        yield record if isinstance(record, dict) else {"_error": "Record is not a JSON object."}
+
+def load_checkpoint(path):
+    """Returns {"records": n, "output_offset": bytes} from a checkpoint file, or zeros if absent."""
+    if not path or not os.path.exists(path):
+        return {"records": 0, "output_offset": 0}
+    with open(path) as f:
+        return json.load(f)
+
+def save_checkpoint(path, records, output_offset):
+    """Atomically records how many input records have been fully written."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"records": records, "output_offset": output_offset}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def score_records(records, args):
+    """Yields one output dict per record, scoring blocks of records in parallel when --workers > 1."""
+    block_size = max(1, args.workers) * args.chunk_size * 4
+    position = args.start
+    while True:
+        block = list(islice(records, block_size))
+        if not block:
+            return
+        ids, items, outcomes = [], [], {}
+        for offset, record in enumerate(block):
+            position += 1
+            record_id = record.get(args.id_field)
+            ids.append(position if record_id in (None, "") else record_id)
+            if "_error" in record:
+                outcomes[offset] = {"error": record["_error"]}
+                continue
+            item = {"transcript": record.get(args.text_field, ""), "duration_sec": record.get(args.duration_field, 0)}
+            if record.get(args.words_field) is not None:
+                item["words"] = record[args.words_field]
+            items.append((offset, item))
+        scored = score_batch([item for _, item in items], workers=args.workers, chunk_size=args.chunk_size, raw=args.raw)
+        for (offset, _), outcome in zip(items, scored):
+            outcomes[offset] = outcome
+        for offset, record_id in enumerate(ids):
+            outcome = outcomes[offset]
+            if "error" in outcome:
+                yield {"id": record_id, "error": outcome["error"]}
+            elif args.raw:
+                yield {"id": record_id, "raw": outcome, "raw_version": RAW_METRICS_VERSION}
+            else:
+                yield {"id": record_id, "result": outcome}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a JSONL or CSV file of transcripts, writing JSONL results.")
+    parser.add_argument("input", help="Input file, or '-' for stdin.")
+    parser.add_argument("-o", "--output", help="Output JSONL file (default: stdout).")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from the file extension, else jsonl).")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes (default: 1, score in-process).")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Records per worker task (default: 16).")
+    parser.add_argument("--raw", action="store_true", help="Write raw metrics for rescore_cli.py instead of scores.")
+    parser.add_argument("--checkpoint", help="Checkpoint file; if it exists, resume after the last record it records.")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="transcript")
+    parser.add_argument("--duration-field", default="duration_sec")
+    parser.add_argument("--words-field", default="words", help="Field holding ASR word timestamps, if any (JSONL only).")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    if args.checkpoint and not args.output:
+        parser.error("--checkpoint requires --output so partial output can be truncated on resume.")
+
+    checkpoint = load_checkpoint(args.checkpoint)
+    args.start = checkpoint["records"]
+    if args.start:
+        output_size = os.path.getsize(args.output) if os.path.exists(args.output) else None
+        if output_size is None or output_size < checkpoint["output_offset"]:
+            found = "missing" if output_size is None else f"only {output_size} bytes"
+            parser.error(f"Cannot resume: checkpoint {args.checkpoint} covers {args.start} records "
+                         f"({checkpoint['output_offset']} bytes of output), but {args.output} is {found}. "
+                         "Restore the output or delete the checkpoint to start over.")
+
+    if args.input == "-":
+        in_stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        in_stream = open(args.input, encoding="utf-8", newline="")
+
+    if args.output:
+        out_stream = open(args.output, "r+b" if args.start else "wb")
+        # Drop anything written after the last checkpoint (e.g. a partial line from a crash)
+        out_stream.truncate(checkpoint["output_offset"] if args.start else 0)
+        out_stream.seek(0, os.SEEK_END)
+    else:
+        out_stream = sys.stdout.buffer
+
+    written = args.start
+    try:
+        records = islice(read_records(in_stream, fmt), args.start, None)
+        for output in score_records(records, args):
+            out_stream.write(json.dumps(output).encode("utf-8") + b"\n")
+            written += 1
+            if args.checkpoint and written % 1000 == 0:
+                out_stream.flush()
+                os.fsync(out_stream.fileno())
+                save_checkpoint(args.checkpoint, written, out_stream.tell())
+        out_stream.flush()
+        if args.checkpoint:
+            save_checkpoint(args.checkpoint, written, out_stream.tell())
+    finally:
+        in_stream.close()
+        if args.output:
+            out_stream.close()
+    print(f"{'Extracted' if args.raw else 'Scored'} {written - args.start} records ({written} total).", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
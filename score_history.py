@@ -0,0 +1,162 @@
+"""SQLite store of past scores with cohort/class/date summaries and percentile ranks.
+
+Every recorded score is a row in `scores`, indexed by (cohort, class_name, day). Alongside it,
+record() updates summary rows in the same transaction: one per combination of {this cohort,
+any cohort} x {this class, any class} x {this day, any day}, each holding the count, score
+sum and sum of squares, per-metric score sums and a count for every final score from 0 to
+100. Aggregates and percentile ranks read those rows instead of scanning `scores`: a query
+without a date range reads one row, and a date range reads one row per day in it.
+
+Final scores are whole numbers from 0 to 100, so the per-score counts are an exact quantile
+sketch of constant size; percentile ranks need no approximation.
+"""
+import json
+import threading
+import time
+from array import array
+
+MAX_SCORE = 100
+ANY = "" # summary key for "all cohorts", "all classes" or "all days"
+DISTRIBUTION_BIN = 10
+
+class ScoreHistory:
+    """Records scored results and answers cohort aggregates and percentile ranks from incremental summaries."""
+
+    def __init__(self, db_path=":memory:"):
+        import sqlite3
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "id INTEGER PRIMARY KEY, cohort TEXT NOT NULL, class_name TEXT NOT NULL, day TEXT NOT NULL, "
+            "scored_at REAL NOT NULL, final_score INTEGER NOT NULL, word_count INTEGER NOT NULL, metric_scores TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS scores_cohort_class_day ON scores (cohort, class_name, day)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "cohort TEXT NOT NULL, class_name TEXT NOT NULL, day TEXT NOT NULL, count INTEGER NOT NULL, "
+            "score_sum REAL NOT NULL, score_sq_sum REAL NOT NULL, metric_sums TEXT NOT NULL, score_counts BLOB NOT NULL, "
+            "PRIMARY KEY (cohort, class_name, day))"
+        )
+
+    def record(self, result, cohort=None, class_name=None, day=None):
+        """Stores an analyze_transcript result (verbose or compact) and updates its summaries; returns its percentile_rank().
+
+        day is an ISO date string (default: today, UTC); cohort and class_name are optional labels.
+        """
+        cohort, class_name = cohort or ANY, class_name or ANY
+        day = day or time.strftime("%Y-%m-%d", time.gmtime())
+        final_score = min(MAX_SCORE, max(0, int(result["final_score"])))
+        if "metrics" in result:
+            # A compact result: {name: [score, number, feedback id]}
+            metric_scores = {name: values[0] for name, values in result["metrics"].items()}
+        else:
+            metric_scores = {name: entry["Score"] for category in result["detailed_feedback"].values()
+                             for name, entry in category["Metrics"].items()}
+        keys = {(c, k, d) for c in (cohort, ANY) for k in (class_name, ANY) for d in (day, ANY)}
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO scores (cohort, class_name, day, scored_at, final_score, word_count, metric_scores) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (cohort, class_name, day, time.time(), final_score, result["total_word_count"], json.dumps(metric_scores))
+                )
+                for key in keys:
+                    self._add_to_summary(key, final_score, metric_scores)
+                rank_row = self._summary_row(cohort, class_name, ANY)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return _percentile_rank(final_score, rank_row)
+
+    def _add_to_summary(self, key, final_score, metric_scores):
+        # Caller holds the lock and an open transaction
+        row = self._db.execute("SELECT count, score_sum, score_sq_sum, metric_sums, score_counts FROM summaries "
+                               "WHERE cohort = ? AND class_name = ? AND day = ?", key).fetchone()
+        if row is None:
+            count, score_sum, score_sq_sum, metric_sums, score_counts = 0, 0.0, 0.0, {}, _empty_counts()
+        else:
+            count, score_sum, score_sq_sum = row[:3]
+            metric_sums, score_counts = json.loads(row[3]), _decode_counts(row[4])
+        for name, score in metric_scores.items():
+            metric_sums[name] = metric_sums.get(name, 0) + score
+        score_counts[final_score] += 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO summaries (cohort, class_name, day, count, score_sum, score_sq_sum, metric_sums, score_counts) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (count + 1, score_sum + final_score, score_sq_sum + final_score * final_score,
+                   json.dumps(metric_sums), score_counts.tobytes())
+        )
+
+    def _summary_row(self, cohort, class_name, day):
+        row = self._db.execute("SELECT count, score_sum, score_sq_sum, metric_sums, score_counts FROM summaries "
+                               "WHERE cohort = ? AND class_name = ? AND day = ?", (cohort, class_name, day)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], json.loads(row[3]), _decode_counts(row[4])
+
+    def percentile_rank(self, final_score, cohort=None, class_name=None):
+        """Percentage of recorded scores in the cohort/class below final_score, counting ties as half; None if there are none."""
+        with self._lock:
+            row = self._summary_row(cohort or ANY, class_name or ANY, ANY)
+        return _percentile_rank(min(MAX_SCORE, max(0, int(final_score))), row)
+
+    def aggregate(self, cohort=None, class_name=None, since=None, until=None):
+        """Returns count, mean, stddev, score distribution and per-metric averages from the summaries.
+
+        since and until are inclusive ISO dates; without them the all-days summary row is used.
+        """
+        cohort, class_name = cohort or ANY, class_name or ANY
+        with self._lock:
+            if since is None and until is None:
+                row = self._summary_row(cohort, class_name, ANY)
+                rows = [row] if row is not None else []
+            else:
+                rows = [(r[0], r[1], r[2], json.loads(r[3]), _decode_counts(r[4])) for r in self._db.execute(
+                    "SELECT count, score_sum, score_sq_sum, metric_sums, score_counts FROM summaries "
+                    "WHERE cohort = ? AND class_name = ? AND day != ? AND day >= ? AND day <= ?",
+                    (cohort, class_name, ANY, since or "0000-00-00", until or "9999-99-99")
+                )]
+
+        count, score_sum, score_sq_sum = 0, 0.0, 0.0
+        metric_sums, score_counts = {}, _empty_counts()
+        for row_count, row_sum, row_sq_sum, row_metric_sums, row_score_counts in rows:
+            count += row_count
+            score_sum += row_sum
+            score_sq_sum += row_sq_sum
+            for name, total in row_metric_sums.items():
+                metric_sums[name] = metric_sums.get(name, 0) + total
+            score_counts = array("q", map(sum, zip(score_counts, row_score_counts)))
+
+        summary = {"cohort": cohort or None, "class": class_name or None, "since": since, "until": until, "count": count}
+        if not count:
+            return dict(summary, mean=None, stddev=None, distribution=[], metric_averages={})
+        mean = score_sum / count
+        distribution = []
+        for low in range(0, MAX_SCORE, DISTRIBUTION_BIN):
+            # The last bin also takes the top score (90-100)
+            high = low + DISTRIBUTION_BIN - 1 if low + DISTRIBUTION_BIN < MAX_SCORE else MAX_SCORE
+            distribution.append({"range": f"{low}-{high}", "count": sum(score_counts[low:high + 1])})
+        return dict(summary, mean=round(mean, 2), stddev=round(max(0.0, score_sq_sum / count - mean * mean) ** 0.5, 2),
+                    distribution=distribution, metric_averages={name: round(total / count, 2) for name, total in metric_sums.items()})
+
+def _empty_counts():
+    return array("q", bytes(8 * (MAX_SCORE + 1)))
+
+def _decode_counts(blob):
+    # One signed 64-bit count per final score, in native byte order
+    counts = array("q")
+    counts.frombytes(blob)
+    return counts
+
+def _percentile_rank(final_score, row):
+    if row is None or not row[0]:
+        return None
+    score_counts = row[4]
+    below = sum(score_counts[:final_score])
+    return round((below + score_counts[final_score] / 2) / row[0] * 100, 1)
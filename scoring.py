@@ -0,0 +1,1219 @@
+"""Scoring core for the AI Transcript Scoring Tool.
+
+Everything needed to score a transcript: tokenization, the rubric, phrase matching, bucket
+lookup, analyze_transcript, batch fan-out and live sessions. It imports only the standard
+library, so worker processes and the CLI can use it without loading Flask; NLTK is only
+imported when SCORER_TOKENIZER=nltk. The web layer lives in completecode.py.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import warnings
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import cached_property, partial
+from types import SimpleNamespace
+
+from grammar import GRAMMAR_CHECKER, has_uppercase
+from pacing import PACING_NOTES, pacing_notes, read_timed_words
+
+# --- 1. TOKENIZATION ---
+# A token is a maximal run of word characters (Unicode letters, digits and underscore, i.e. regex \w)
+# in the lowercased text. Punctuation and whitespace separate tokens and are never tokens themselves,
+# so "Don't stop, 2nd-year!" -> ["don", "t", "stop", "2nd", "year"].
+
+_TOKEN = re.compile(r'\w+')
+
+def regex_word_tokenize(text):
+    """Default tokenizer: lowercased runs of word characters."""
+    return _TOKEN.findall(text.lower())
+
+def load_nltk_tokenizer():
+    """Returns an NLTK-based tokenizer for lowercased text (opt-in), raising if NLTK or its punkt data is missing.
+
+    NLTK splits words differently ("don't" -> "do", "n't"); punctuation-only tokens are
+    dropped, so its tokens follow the same token definition otherwise.
+    """
+    from nltk.tokenize import word_tokenize
+    word_tokenize("Check punkt data.")
+
+    def nltk_tokenize_lowercased(text_lower):
+        return [token for token in word_tokenize(text_lower) if _TOKEN.search(token)]
+    return nltk_tokenize_lowercased
+
+def resolve_tokenizer(backend):
+    """Picks the tokenizer once at startup; an unavailable NLTK backend falls back to regex with a warning.
+
+    Returns (backend name, function taking already-lowercased text).
+    """
+    if backend == "regex":
+        return "regex", _TOKEN.findall
+    if backend == "nltk":
+        try:
+            return "nltk", load_nltk_tokenizer()
+        except Exception as e:
+            warnings.warn(f"NLTK tokenizer unavailable ({type(e).__name__}); using the regex tokenizer.", RuntimeWarning, stacklevel=2)
+            return "regex", _TOKEN.findall
+    raise ValueError(f"Unknown tokenizer backend: {backend!r} (expected 'regex' or 'nltk').")
+
+TOKENIZER_BACKEND, tokenize_lowercased = resolve_tokenizer(os.environ.get("SCORER_TOKENIZER", "regex"))
+
+def safe_word_tokenize(text):
+    """Tokenizes text with the backend chosen at startup (see TOKENIZER_BACKEND)."""
+    return tokenize_lowercased(text.lower())
+
+# --- 2. RUBRIC ---
+
+RUBRIC = {
+    "Content & Structure": {
+        "Weightage": 40,
+        "Metrics": {
+            "Salutation Level": {
+                "Weightage": 5,
+                "Rules": [
+                    {"Description": "Score if a clear salutation is present (e.g., 'Hello everyone', 'Good morning').", "PassScore": 5, "Threshold": 1} # 1 = yes
+                ]
+            },
+            "Key word Presence": {
+                "Weightage": 30,
+                "Keywords": ["name", "age", "class", "school", "family", "hobbies", "goals", "unique point"],
+                "Rules": [
+                    # Score is calculated based on the number of keywords found (max 30 points)
+                    {"Description": "Points scaled by keywords found (out of 8 defined keywords).", "MaxScore": 30}
+                ]
+            },
+            "Flow": {
+                "Weightage": 5,
+                "Rules": [
+                    {"Description": "Score if the introduction follows a logical order (Salutation -> Details -> Closing).", "PassScore": 5, "Threshold": 1} # 1 = yes
+                ]
+            }
+        }
+    },
+    "Speech Rate": {
+        "Weightage": 10,
+        "Metrics": {
+            "Speech rate (WPM)": {
+                "Weightage": 10,
+                "ScoringBuckets": [
+                    {"Range": "111 - 140 WPM", "Score": 10, "Feedback": "Excellent pace! Very comfortable for listening."},
+                    {"Range": "> 140 WPM", "Score": 6, "Feedback": "A bit too fast. Try to slow down for better clarity."},
+                    {"Range": "81 - 110 WPM", "Score": 6, "Feedback": "A bit slow. Speed up slightly to keep listeners engaged."},
+                    {"Range": "< 80 WPM", "Score": 2, "Feedback": "Too slow. The pace significantly impacts engagement."}
+                ]
+            }
+        }
+    },
+    "Language & Grammar": {
+        "Weightage": 20, # Combined weight for the two metrics
+        "Metrics": {
+            "Grammar errors (Score)": {
+                "Weightage": 10,
+                "ScoringBuckets": [
+                    {"Range": "> 0.9", "Score": 10, "Feedback": "Impeccable grammar. Very high quality language use."},
+                    {"Range": "0.7 to 0.89", "Score": 8, "Feedback": "Good grammar, only minor, non-distracting errors."},
+                    {"Range": "0.5 to 0.69", "Score": 6, "Feedback": "Average grammar, with a few noticeable errors."},
+                    {"Range": "0.3 to 0.49", "Score": 4, "Feedback": "Needs significant improvement in grammar and sentence structure."},
+                    {"Range": "< 0.3", "Score": 2, "Feedback": "Severe grammar issues that compromise clarity."}
+                ]
+            },
+            "Vocabulary richness (TTR)": {
+                "Weightage": 10,
+                "ScoringBuckets": [
+                    {"Range": "0.9–1.0", "Score": 10, "Feedback": "Excellent vocabulary richness (TTR). Diverse and engaging word choices."},
+                    {"Range": "0.7–0.89", "Score": 8, "Feedback": "Good vocabulary. Sufficient variation in word choice."},
+                    {"Range": "0.5–0.69", "Score": 6, "Feedback": "Acceptable vocabulary, but could be more diverse."},
+                    {"Range": "0.3–0.49", "Score": 4, "Feedback": "Low vocabulary richness. Repetitive and basic word usage."},
+                    {"Range": "0–0.29", "Score": 2, "Feedback": "Very low vocabulary richness, making the text monotonous."}
+                ]
+            }
+        }
+    },
+    "Clarity": {
+        "Weightage": 30,
+        "Metrics": {
+            "Filler Word Rate": {
+                "Weightage": 30,
+                "ScoringBuckets": [
+                    {"Range": "< 1.0%", "Score": 30, "Feedback": "Exceptional clarity. No distracting filler words."},
+                    {"Range": "1.0% - 1.9%", "Score": 25, "Feedback": "Very good clarity. Minimal use of filler words."},
+                    {"Range": "2.0% - 2.9%", "Score": 20, "Feedback": "Good clarity. Filler usage is present but not excessive."},
+                    {"Range": "3.0% - 3.9%", "Score": 15, "Feedback": "Average clarity. Reduce filler words for better impact."},
+                    {"Range": "4.0% - 4.9%", "Score": 10, "Feedback": "Low clarity. Excessive filler words distract the listener."},
+                    {"Range": "> 5.0%", "Score": 5, "Feedback": "Very low clarity. The presentation is heavily disrupted by filler words."}
+                ]
+            }
+        }
+    }
+}
+
+FILLER_WORDS = ["um", "uh", "like", "you know", "so", "actually", "basically", "right", "i mean", "well", "kinda", "sort of", "okay", "hmm", "ah"]
+
+# Simple semantic check based on keyword presence (plain substring match)
+KEYWORD_PHRASES = {
+    "name": ["i am", "myself", "my name"],
+    "age": ["i am", "years old"],
+    "class": ["class", "grade"],
+    "school": ["school", "university", "college"],
+    "family": ["family", "parents", "mother", "father", "siblings"],
+    "hobbies": ["enjoy", "like to", "hobbies", "interests", "play"],
+    "goals": ["want to be", "my goal", "aspire to", "future"],
+    "unique point": ["special thing", "fun fact", "one thing people don't know"]
+}
+
+# Salutation Level accepts leading whitespace; Flow requires the greeting at the very start
+SALUTATION_PHRASES = ["hello", "good morning", "good day", "greetings"]
+FLOW_SALUTATION_PHRASES = ["hello", "good morning", "greetings"]
+
+# Closing must be near the end (within the last CLOSING_WINDOW characters)
+CLOSING_PHRASES = ["thank you", "that is all", "i'm done"]
+CLOSING_WINDOW = 50
+
+# --- 3. LOGIC FUNCTIONS ---
+
+_WORD_CHAR = re.compile(r'\w')
+
+class PhraseMatcher:
+    """Finds fillers, keyword phrases, salutations and closings in a single pass over the text.
+
+    All phrases are compiled into one regex of the form (?=(alt|alt|...)), grouped by first
+    character and ordered longest-first, so each position reports the longest phrase starting
+    there. Every shorter phrase starting at the same position is one of its prefixes, which are
+    precomputed, so overlapping phrases ("like" / "like to") are all seen. Each category then
+    applies its own rule, matching the original per-phrase checks:
+
+    - filler: whole-word match (regex \\b on both ends), non-overlapping per phrase like re.findall
+    - keyword: plain substring match
+    - salutation: at the start of the text after optional whitespace
+    - flow_salutation: at index 0
+    - closing: fully inside the last `closing_window` characters
+    """
+
+    def __init__(self, fillers, keyword_phrases, salutations, flow_salutations, closings, closing_window=50):
+        self.fillers = list(fillers)
+        self.keyword_phrases = {key: list(phrases) for key, phrases in keyword_phrases.items()}
+        self.closings = list(closings)
+        self.closing_window = closing_window
+
+        # phrase -> list of (category, label)
+        roles = {}
+        for filler in self.fillers:
+            if not (_WORD_CHAR.match(filler[0]) and _WORD_CHAR.match(filler[-1])):
+                raise ValueError(f"Filler phrase must start and end with a word character: {filler!r}")
+            roles.setdefault(filler, []).append(("filler", filler))
+        for key, phrases in self.keyword_phrases.items():
+            for phrase in phrases:
+                roles.setdefault(phrase, []).append(("keyword", key))
+        for phrase in salutations:
+            roles.setdefault(phrase, []).append(("salutation", phrase))
+        for phrase in flow_salutations:
+            roles.setdefault(phrase, []).append(("flow_salutation", phrase))
+        for phrase in closings:
+            roles.setdefault(phrase, []).append(("closing", phrase))
+        if "" in roles:
+            raise ValueError("Empty phrases cannot be matched.")
+        self._roles = roles
+
+        by_first_char = {}
+        for phrase in sorted(roles, key=len, reverse=True):
+            by_first_char.setdefault(phrase[0], []).append(re.escape(phrase[1:]))
+        alternation = '|'.join(re.escape(char) + '(?:' + '|'.join(rests) + ')' for char, rests in by_first_char.items())
+        self._pattern = re.compile('(?=(' + alternation + '))')
+        self._prefixes = {phrase: [p for p in roles if phrase.startswith(p)] for phrase in roles}
+
+    def new_state(self):
+        """Returns empty running counts for scan_into."""
+        return {
+            "filler_counts": dict.fromkeys(self.fillers, 0),
+            "filler_ends": {},
+            "keyword_details": dict.fromkeys(self.keyword_phrases, False),
+            "salutation_start": None,
+            "has_salutation": False,
+            "has_flow_salutation": False,
+            "has_closing": False
+        }
+
+    def scan(self, text):
+        """Scans the text once and returns counts, flags and match offsets.
+
+        Offsets index into text.lower(), which has the same length as the original text
+        except for a handful of non-ASCII characters.
+        """
+        return self.scan_lowercased(text.lower())
+
+    def scan_lowercased(self, text_lower):
+        """scan() for text that is already lowercased."""
+        length = len(text_lower)
+        state = self.new_state()
+        state["salutation_start"] = length - len(text_lower.lstrip())
+        matches = []
+        self.scan_into(state, text_lower, 0, length, "", max(0, length - self.closing_window), matches)
+        return self.summarize(state, matches)
+
+    def scan_into(self, state, text_lower, offset, limit, prev_char, closing_start=None, matches=None):
+        """Adds every match starting before `limit` in text_lower to state.
+
+        text_lower starts at absolute position `offset` of the full text and prev_char is the
+        character just before it ("" at the start). Closing phrases are only checked when
+        closing_start is given, and match dicts are only collected when matches is a list.
+        """
+        length = len(text_lower)
+        filler_counts, filler_ends, keyword_details = state["filler_counts"], state["filler_ends"], state["keyword_details"]
+        for m in self._pattern.finditer(text_lower):
+            start = m.start()
+            if start >= limit:
+                break
+            position = offset + start
+            for phrase in self._prefixes[m.group(1)]:
+                end = start + len(phrase)
+                for category, label in self._roles[phrase]:
+                    if category == "filler":
+                        if position < filler_ends.get(phrase, 0):
+                            continue
+                        if start > 0:
+                            if _WORD_CHAR.match(text_lower, start - 1):
+                                continue
+                        elif prev_char and _WORD_CHAR.match(prev_char):
+                            continue
+                        if end < length and _WORD_CHAR.match(text_lower, end):
+                            continue
+                        filler_ends[phrase] = offset + end
+                        filler_counts[phrase] += 1
+                    elif category == "keyword":
+                        keyword_details[label] = True
+                    elif category == "salutation":
+                        if position != state["salutation_start"]:
+                            continue
+                        state["has_salutation"] = True
+                    elif category == "flow_salutation":
+                        if position != 0:
+                            continue
+                        state["has_flow_salutation"] = True
+                    elif category == "closing":
+                        if closing_start is None or position < closing_start:
+                            continue
+                        state["has_closing"] = True
+                    if matches is not None:
+                        matches.append({"category": category, "label": label, "phrase": phrase, "start": position, "end": offset + end})
+
+    def summarize(self, state, matches=None):
+        """Builds the scan result dict from running counts."""
+        filler_counts, keyword_details = state["filler_counts"], state["keyword_details"]
+        return {
+            "filler_count": sum(filler_counts.values()),
+            "filler_counts": filler_counts,
+            "found_keywords": sum(keyword_details.values()),
+            "keyword_details": keyword_details,
+            "has_salutation": 1 if state["has_salutation"] else 0,
+            "has_flow": 1 if state["has_flow_salutation"] and state["has_closing"] else 0,
+            "matches": matches if matches is not None else []
+        }
+
+class IncrementalPhraseScan:
+    """Runs a PhraseMatcher over text that arrives in chunks, giving the same counts as one scan of the whole text.
+
+    Matches are only committed once the text after their start is at least as long as the
+    longest phrase, so a phrase split across chunks ("you" + " know") is seen whole. The
+    uncommitted tail and the last closing_window characters are kept; everything else is
+    dropped, so memory does not grow with the text.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.state = matcher.new_state()
+        self.length = 0
+        self._buffer = ""
+        self._offset = 0
+        self._prev_char = ""
+        self._tail = ""
+        self._horizon = max(len(phrase) for phrase in matcher._roles)
+
+    def feed(self, text):
+        """Adds the next chunk of (original-case) text."""
+        text_lower = text.lower()
+        if self.state["salutation_start"] is None:
+            stripped = text_lower.lstrip()
+            if stripped:
+                self.state["salutation_start"] = self.length + len(text_lower) - len(stripped)
+        self.length += len(text_lower)
+        self._tail = (self._tail + text_lower)[-self.matcher.closing_window:]
+        self._buffer += text_lower
+        limit = len(self._buffer) - self._horizon
+        if limit > 0:
+            self.matcher.scan_into(self.state, self._buffer, self._offset, limit, self._prev_char)
+            self._prev_char = self._buffer[limit - 1]
+            self._buffer = self._buffer[limit:]
+            self._offset += limit
+
+    def result(self):
+        """Returns the scan result for all text fed so far, without highlights."""
+        state = {key: dict(value) if isinstance(value, dict) else value for key, value in self.state.items()}
+        self.matcher.scan_into(state, self._buffer, self._offset, len(self._buffer), self._prev_char)
+        state["has_closing"] = any(phrase in self._tail for phrase in self.matcher.closings)
+        return self.matcher.summarize(state)
+
+PHRASE_MATCHER = PhraseMatcher(FILLER_WORDS, KEYWORD_PHRASES, SALUTATION_PHRASES, FLOW_SALUTATION_PHRASES, CLOSING_PHRASES, CLOSING_WINDOW)
+
+def calculate_wpm(word_count, duration_sec):
+    """Calculates Words Per Minute (WPM)."""
+    if duration_sec <= 0:
+        return 0
+    return (word_count / duration_sec) * 60
+
+def calculate_ttr(words):
+    """Calculates Type-Token Ratio (TTR)."""
+    if not words:
+        return 0.0
+    return len(set(words)) / len(words)
+
+def count_filler_words(text):
+    """Counts common filler words in the text."""
+    return PHRASE_MATCHER.scan(text)["filler_count"]
+
+def check_content_keywords(text):
+    """Checks for the presence of mandatory content keywords."""
+    scan = PHRASE_MATCHER.scan(text)
+    return scan["found_keywords"], scan["keyword_details"]
+
+def check_flow(text):
+    """Checks for flow (Salutation -> Details -> Closing). A highly simplified check."""
+    return PHRASE_MATCHER.scan(text)["has_flow"]
+
+_NUMBER = r'(-?\d+(?:\.\d+)?)'
+_BOUND_RANGE = re.compile(r'^([<>]=?)\s*' + _NUMBER + r'$')
+_SPAN_RANGE = re.compile(r'^' + _NUMBER + r'\s*(?:-|–|—|to)\s*' + _NUMBER + r'$')
+
+def parse_range(range_str):
+    """Parses a bucket "Range" string into (low, low_closed, high, high_closed).
+
+    Accepts "< X", "> X", "<= X", ">= X" and "X - Y" / "X to Y" / "X–Y" (closed on both ends),
+    with optional "WPM" and "%" units.
+    """
+    cleaned = range_str.replace('WPM', '').replace('%', '').strip()
+    m = _BOUND_RANGE.match(cleaned)
+    if m:
+        op, value = m.group(1), float(m.group(2))
+        if op.startswith('<'):
+            return float('-inf'), False, value, op == '<='
+        return value, op == '>=', float('inf'), False
+    m = _SPAN_RANGE.match(cleaned)
+    if m:
+        low, high = float(m.group(1)), float(m.group(2))
+        if low > high:
+            raise ValueError(f"Range {range_str!r} has its low end above its high end.")
+        return low, True, high, True
+    raise ValueError(f"Unrecognized bucket range: {range_str!r}")
+
+class CompiledBuckets:
+    """One metric's ScoringBuckets as sorted, contiguous numeric intervals searched with bisect.
+
+    Ranges are written at display precision ("1.0% - 1.9%", "81 - 110 WPM"), which leaves gaps
+    between neighbouring buckets. Each gap is assigned to the bucket below it by extending that
+    bucket's upper end to the next bucket's lower end; the filled gaps are kept in `gaps`.
+    Overlapping buckets are a rubric error and raise ValueError. Values outside every bucket
+    fall back to the last bucket in rubric order.
+    """
+
+    def __init__(self, scoring_buckets, name="metric"):
+        if not scoring_buckets:
+            raise ValueError(f"{name} has no scoring buckets.")
+        intervals = sorted(
+            (parse_range(bucket["Range"]) + (bucket,) for bucket in scoring_buckets),
+            key=lambda iv: (iv[0], not iv[1])
+        )
+        self.gaps = []
+        for i in range(len(intervals) - 1):
+            low, low_closed, high, high_closed, bucket = intervals[i]
+            next_low, next_low_closed = intervals[i + 1][0], intervals[i + 1][1]
+            if high > next_low or (high == next_low and high_closed and next_low_closed):
+                raise ValueError(f"{name}: bucket {bucket['Range']!r} overlaps {intervals[i + 1][4]['Range']!r}.")
+            if high < next_low or (not high_closed and not next_low_closed):
+                self.gaps.append((high, high_closed, next_low, next_low_closed))
+                intervals[i] = (low, low_closed, next_low, not next_low_closed, bucket)
+
+        # A value v is admitted by a lower end (low, closed) iff (low, 0 if closed else 1) <= (v, 0).
+        # Only the last interval's upper end needs checking, since the intervals are contiguous.
+        self.lower_keys = [(low, 0 if low_closed else 1) for low, low_closed, _, _, _ in intervals]
+        self.high, self.high_closed = intervals[-1][2], intervals[-1][3]
+        self.results = [(bucket["Score"], bucket["Feedback"]) for _, _, _, _, bucket in intervals]
+        self.fallback = (scoring_buckets[-1]["Score"], scoring_buckets[-1]["Feedback"])
+
+    def lookup(self, metric_value):
+        """Returns (score, feedback) for the bucket containing metric_value."""
+        index = bisect_right(self.lower_keys, (metric_value, 0)) - 1
+        if index < 0:
+            return self.fallback
+        if index == len(self.results) - 1 and not (metric_value < self.high or (metric_value == self.high and self.high_closed)):
+            return self.fallback
+        return self.results[index]
+
+class CompiledRubric:
+    """Compiles every metric with ScoringBuckets in a rubric once, for O(log n) lookups by metric name.
+
+    specs maps every metric name to its rubric entry (weightage, rules, keywords), so results
+    can be scored against a rubric other than RUBRIC (see score_raw_metrics). feedback_ids maps
+    each bucket's feedback text to its index in the metric's ScoringBuckets, for compact results.
+    """
+
+    def __init__(self, rubric):
+        self.metrics = {}
+        self.specs = {}
+        self.feedback_ids = {}
+        for category in rubric.values():
+            for metric_name, metric in category["Metrics"].items():
+                self.specs[metric_name] = metric
+                if "ScoringBuckets" in metric:
+                    self.feedback_ids[metric_name] = {bucket["Feedback"]: i for i, bucket in enumerate(metric["ScoringBuckets"])}
+                    self.metrics[metric_name] = CompiledBuckets(metric["ScoringBuckets"], metric_name)
+
+    def lookup(self, metric_name, metric_value):
+        """Returns (score, feedback) for metric_value under the named metric."""
+        return self.metrics[metric_name].lookup(metric_value)
+
+def get_score_and_feedback(metric_value, scoring_buckets, is_filler_rate=False):
+    """Finds the corresponding score and feedback based on the metric value and scoring buckets.
+
+    Compiles the buckets on every call; analyze_transcript uses the precompiled COMPILED_RUBRIC.
+    is_filler_rate is kept for backwards compatibility and no longer needed, since each range
+    string carries its own unit.
+    """
+    return CompiledBuckets(scoring_buckets).lookup(metric_value)
+
+COMPILED_RUBRIC = CompiledRubric(RUBRIC)
+
+GRAMMAR_WORKERS = int(os.environ.get("SCORER_GRAMMAR_WORKERS", "2"))
+GRAMMAR_BUDGET_SEC = float(os.environ.get("SCORER_GRAMMAR_BUDGET_MS", "250")) / 1000
+# Scored in place of a grammar check that ran out of time (the old fixed estimate)
+GRAMMAR_FALLBACK_ERRORS_PER_100_WORDS = 0.8
+
+_grammar_executor = None
+_grammar_executor_pid = None
+_grammar_executor_lock = threading.Lock()
+
+def _get_grammar_executor():
+    """Returns this process's grammar thread pool, creating it on first use (forked children get their own)."""
+    global _grammar_executor, _grammar_executor_pid
+    with _grammar_executor_lock:
+        if _grammar_executor is None or _grammar_executor_pid != os.getpid():
+            from concurrent.futures import ThreadPoolExecutor
+            _grammar_executor = ThreadPoolExecutor(max_workers=GRAMMAR_WORKERS, thread_name_prefix="grammar")
+            _grammar_executor_pid = os.getpid()
+        return _grammar_executor
+
+def check_grammar(transcript, sentence_spans, budget_sec=None):
+    """Runs GRAMMAR_CHECKER within a time budget; returns its issues, or None if the budget ran out.
+
+    With SCORER_GRAMMAR_WORKERS > 0 the check runs on a bounded thread pool and the caller
+    stops waiting when the budget is spent; with 0 it runs inline. Either way the checker
+    itself gives up at the deadline, and time spent queued counts against the budget.
+    """
+    budget_sec = GRAMMAR_BUDGET_SEC if budget_sec is None else budget_sec
+    deadline = time.monotonic() + budget_sec
+    if GRAMMAR_WORKERS <= 0:
+        return GRAMMAR_CHECKER.check(transcript, sentence_spans, deadline)
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+    future = _get_grammar_executor().submit(GRAMMAR_CHECKER.check, transcript, sentence_spans, deadline)
+    try:
+        return future.result(timeout=budget_sec)
+    except FutureTimeoutError:
+        future.cancel()
+        return None
+
+_SENTENCE = re.compile(r'\S[^.!?]*(?:[.!?]+|$)')
+
+def _split_casing(issues):
+    """Returns (non-capitalization issue count, capitalization issue count)."""
+    casing = sum(1 for issue in issues if issue.rule == "capitalization")
+    return len(issues) - casing, casing
+
+class IncrementalGrammarCheck:
+    """Runs GRAMMAR_CHECKER over text that arrives in chunks, giving the same error count as checking it whole.
+
+    A sentence is checked once a character after its closing punctuation has arrived; only the
+    unfinished sentence is kept. Capitalization errors are counted separately and only included
+    once any uppercase letter has been seen, as GrammarChecker.check does. With
+    max_sentence_chars, an unfinished sentence longer than that is checked as it stands and
+    dropped, which bounds memory for unpunctuated text at the cost of exactness there.
+    """
+
+    def __init__(self, max_sentence_chars=None):
+        self.max_sentence_chars = max_sentence_chars
+        self.tail = ""
+        self._errors = 0
+        self._casing_errors = 0
+        self._saw_upper = False
+
+    def feed(self, text):
+        """Adds the next chunk of (original-case) text."""
+        self._saw_upper = self._saw_upper or has_uppercase(text)
+        tail = self.tail + text
+        spans = []
+        for m in _SENTENCE.finditer(tail):
+            if m.end() == len(tail):
+                break
+            spans.append(m.span())
+        done = spans[-1][1] if spans else 0
+        if spans:
+            self._add(tail[:done], spans)
+        self.tail = tail[done:]
+        if self.max_sentence_chars is not None and len(self.tail) > self.max_sentence_chars:
+            self._add(self.tail, [m.span() for m in _SENTENCE.finditer(self.tail)])
+            self.tail = ""
+
+    def _add(self, text, spans):
+        if spans:
+            errors, casing = _split_casing(GRAMMAR_CHECKER.check_sentences(text, spans))
+            self._errors += errors
+            self._casing_errors += casing
+
+    def error_count(self):
+        """Returns the error count for all text fed so far, including the unfinished sentence."""
+        errors, casing = self._errors, self._casing_errors
+        spans = [m.span() for m in _SENTENCE.finditer(self.tail)]
+        if spans:
+            pending_errors, pending_casing = _split_casing(GRAMMAR_CHECKER.check_sentences(self.tail, spans))
+            errors += pending_errors
+            casing += pending_casing
+        return errors + casing if self._saw_upper else errors
+
+def _stage(compute):
+    """cached_property that, when the context has a timings dict, adds its own run time to timings[name].
+
+    Times are exclusive: an intermediate first computed inside another (e.g. text_lower inside
+    tokens) is counted only under its own name.
+    """
+    name = compute.__name__
+
+    def timed(self):
+        if self.timings is None:
+            return compute(self)
+        self._child_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            return compute(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed - self._child_times.pop()
+            if self._child_times:
+                self._child_times[-1] += elapsed
+    timed.__name__ = name
+    timed.__doc__ = compute.__doc__
+    return cached_property(timed)
+
+class TranscriptContext:
+    """Shared intermediates for one transcript, each computed on first use and then reused.
+
+    Metrics receive only the intermediates they declare in Metric.needs, so a deployment that
+    disables every metric needing e.g. phrase_scan never pays for it. If timings is a dict,
+    the seconds spent on each intermediate are recorded in it (see _stage).
+    """
+
+    def __init__(self, transcript, duration_sec, timings=None):
+        self.transcript = transcript
+        self.duration_sec = duration_sec
+        self.timings = timings
+        self._child_times = []
+
+    @_stage
+    def text_lower(self):
+        return self.transcript.lower()
+
+    @_stage
+    def tokens(self):
+        return tokenize_lowercased(self.text_lower)
+
+    @cached_property
+    def word_count(self):
+        return len(self.tokens)
+
+    @_stage
+    def token_types(self):
+        return set(self.tokens)
+
+    @_stage
+    def sentence_spans(self):
+        """(start, end) offsets of each sentence, split after ., ! or ?"""
+        return [m.span() for m in _SENTENCE.finditer(self.transcript)]
+
+    @_stage
+    def phrase_scan(self):
+        return PHRASE_MATCHER.scan_lowercased(self.text_lower)
+
+    @_stage
+    def grammar_issues(self):
+        """GrammarIssue list, or None if the check ran out of time (see check_grammar)."""
+        return check_grammar(self.transcript, self.sentence_spans)
+
+    @cached_property
+    def grammar_error_count(self):
+        return None if self.grammar_issues is None else len(self.grammar_issues)
+
+class Metric:
+    """One rubric metric: the intermediates it needs, how to extract its raw fields, and how to score them.
+
+    extract(**intermediates) returns a dict of raw fields, which must not depend on the rubric;
+    score(raw, spec, lookup) returns (display value, score, feedback, numeric value), where spec
+    is the metric's entry in the rubric being scored against (weightage, rules, keywords) and
+    lookup(value) is its bucket lookup. Metrics scored by rules rather than ScoringBuckets list
+    their fixed feedback texts in `feedback`; compact results refer to them by index. If
+    estimated_flag names a raw field that is true, the value is a fallback estimate and
+    estimated_note is appended to the feedback.
+    """
+
+    def __init__(self, name, category, needs, extract, score, estimated_flag=None, estimated_note=None, feedback=()):
+        self.name = name
+        self.category = category
+        self.needs = tuple(needs)
+        self.extract = extract
+        self.score = score
+        self.estimated_flag = estimated_flag
+        self.estimated_note = estimated_note
+        self.feedback = tuple(feedback)
+
+# Feedback for rule-scored metrics, indexed by whether the rule passed
+SALUTATION_FEEDBACK = ("Missing a clear, engaging salutation.", "Clear salutation present.")
+FLOW_FEEDBACK = ("The flow is hard to follow. Ensure a clear start and end.", "The introduction follows a logical start-to-end structure.")
+
+def _score_salutation(raw, spec, lookup):
+    has_salutation = raw["has_salutation"]
+    score = spec["Rules"][0]["PassScore"] if has_salutation else 0
+    return has_salutation, score, SALUTATION_FEEDBACK[bool(has_salutation)], int(has_salutation)
+
+def _score_keywords(raw, spec, lookup):
+    keyword_details = raw["keyword_details"]
+    found_keywords = sum(1 for found in keyword_details.values() if found)
+    keyword_total = len(spec["Keywords"])
+    score = int(spec["Rules"][0]["MaxScore"] * (found_keywords / keyword_total))
+    feedback = f"Found {found_keywords} out of {keyword_total} key self-introduction details. (Missing: {', '.join([k for k, v in keyword_details.items() if not v])})"
+    return f"{found_keywords}/{keyword_total}", score, feedback, found_keywords
+
+def _score_flow(raw, spec, lookup):
+    has_flow = raw["has_flow"]
+    score = spec["Rules"][0]["PassScore"] if has_flow else 0
+    return has_flow, score, FLOW_FEEDBACK[bool(has_flow)], int(has_flow)
+
+def _score_wpm(raw, spec, lookup):
+    wpm = calculate_wpm(raw["word_count"], raw["duration_sec"])
+    score, feedback = lookup(wpm)
+    return f"{wpm:.2f}", score, feedback, wpm
+
+def grammar_score(errors_per_100_words):
+    """Rubric grammar formula: 1 - min(errors per 100 words / 10, 1)."""
+    return 1 - min(errors_per_100_words / 10, 1)
+
+def _extract_grammar(grammar_error_count, word_count):
+    if grammar_error_count is None:
+        return {"grammar_errors_per_100_words": GRAMMAR_FALLBACK_ERRORS_PER_100_WORDS, "grammar_timed_out": True}
+    errors_per_100_words = (grammar_error_count / word_count) * 100 if word_count else 0.0
+    return {"grammar_errors_per_100_words": errors_per_100_words, "grammar_timed_out": False}
+
+def _score_grammar(raw, spec, lookup):
+    grammar_score_raw = grammar_score(raw["grammar_errors_per_100_words"])
+    score, feedback = lookup(grammar_score_raw)
+    return f"{grammar_score_raw:.2f}", score, feedback, grammar_score_raw
+
+def _score_ttr(raw, spec, lookup):
+    # Streaming analysis supplies its own TTR estimate (e.g. MATTR) instead of an exact type count
+    if "ttr" in raw:
+        ttr = raw["ttr"]
+    else:
+        ttr = raw["type_count"] / raw["word_count"] if raw["word_count"] else 0.0
+    score, feedback = lookup(ttr)
+    return f"{ttr:.2f}", score, feedback, ttr
+
+def _score_filler_rate(raw, spec, lookup):
+    word_count, filler_count = raw["word_count"], raw["filler_count"]
+    filler_rate = (filler_count / word_count) * 100 if word_count > 0 else 100.0
+    score, feedback = lookup(filler_rate)
+    return f"{filler_rate:.2f}% ({filler_count} filler words)", score, feedback, filler_rate
+
+# In RUBRIC order, which is also the order of detailed_feedback in results
+METRIC_REGISTRY = [
+    Metric("Salutation Level", "Content & Structure", ["phrase_scan"],
+           lambda phrase_scan: {"has_salutation": phrase_scan["has_salutation"]}, _score_salutation, feedback=SALUTATION_FEEDBACK),
+    Metric("Key word Presence", "Content & Structure", ["phrase_scan"],
+           lambda phrase_scan: {"keyword_details": phrase_scan["keyword_details"]}, _score_keywords),
+    Metric("Flow", "Content & Structure", ["phrase_scan"],
+           lambda phrase_scan: {"has_flow": phrase_scan["has_flow"]}, _score_flow, feedback=FLOW_FEEDBACK),
+    Metric("Speech rate (WPM)", "Speech Rate", [],
+           lambda: {}, _score_wpm),
+    Metric("Grammar errors (Score)", "Language & Grammar", ["grammar_error_count", "word_count"],
+           _extract_grammar, _score_grammar, estimated_flag="grammar_timed_out",
+           estimated_note="Grammar check timed out; this is an estimate."),
+    Metric("Vocabulary richness (TTR)", "Language & Grammar", ["token_types"],
+           lambda token_types: {"type_count": len(token_types)}, _score_ttr),
+    Metric("Filler Word Rate", "Clarity", ["phrase_scan"],
+           lambda phrase_scan: {"filler_count": phrase_scan["filler_count"]}, _score_filler_rate),
+]
+
+def resolve_metrics(disabled_names=()):
+    """Returns the registry minus disabled metrics, checking that every RUBRIC metric is implemented."""
+    registered = {metric.name for metric in METRIC_REGISTRY}
+    for category_name, category in RUBRIC.items():
+        for metric_name in category["Metrics"]:
+            if metric_name not in registered:
+                raise ValueError(f"RUBRIC metric {metric_name!r} ({category_name}) has no registered implementation.")
+    unknown = set(disabled_names) - registered
+    if unknown:
+        raise ValueError(f"Cannot disable unknown metrics: {', '.join(sorted(unknown))}")
+    return [metric for metric in METRIC_REGISTRY if metric.name not in disabled_names]
+
+ENABLED_METRICS = resolve_metrics([name.strip() for name in os.environ.get("SCORER_DISABLED_METRICS", "").split(",") if name.strip()])
+
+# Bump when a change to the scoring code alters results for the same input
+ANALYSIS_VERSION = 2
+
+def _fingerprint(**extra):
+    """Hashes the phrase lists, the tokenizer, enabled metrics, ANALYSIS_VERSION and any extra fields."""
+    payload = json.dumps(dict({
+        "analysis_version": ANALYSIS_VERSION,
+        "tokenizer": TOKENIZER_BACKEND,
+        "metrics": [metric.name for metric in ENABLED_METRICS],
+        "fillers": FILLER_WORDS,
+        "keywords": KEYWORD_PHRASES,
+        "salutations": [SALUTATION_PHRASES, FLOW_SALUTATION_PHRASES],
+        "closings": [CLOSING_PHRASES, CLOSING_WINDOW]
+    }, **extra), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def rubric_fingerprint():
+    """Hashes RUBRIC, the phrase lists, the tokenizer, enabled metrics and ANALYSIS_VERSION; any change yields a new version string."""
+    return _fingerprint(rubric=RUBRIC)
+
+RUBRIC_VERSION = rubric_fingerprint()
+
+def raw_metrics_fingerprint():
+    """Hashes what extract_raw_metrics output depends on: everything in rubric_fingerprint except RUBRIC itself.
+
+    Raw metrics stored under this version can be re-scored against any rubric.
+    """
+    return _fingerprint()
+
+RAW_METRICS_VERSION = raw_metrics_fingerprint()
+
+def analyze_transcript(transcript, duration_sec, timings=None, compact=False, pacing=None):
+    """The main scoring and feedback generation logic.
+
+    If timings is a dict, it receives the seconds spent in each stage: the context
+    intermediates (tokens, phrase_scan, grammar_issues, ...) and "scoring" for the rubric lookups.
+    compact=True returns the compact result (see score_raw_metrics), with each highlight as a
+    [category, label, start, end] list. pacing is a summary from word timestamps (see
+    validate_timed_input), added to the result by attach_pacing.
+    """
+    context = TranscriptContext(transcript, duration_sec, timings)
+    raw = extract_raw_metrics(context)
+    if timings is None:
+        result = score_raw_metrics(raw, compact=compact)
+    else:
+        start = time.perf_counter()
+        result = score_raw_metrics(raw, compact=compact)
+        timings["scoring"] = time.perf_counter() - start
+    # Highlights come from the phrase scan, if any enabled metric needed one
+    highlights = context.phrase_scan["matches"] if "phrase_scan" in context.__dict__ else []
+    if compact:
+        highlights = [[match["category"], match["label"], match["start"], match["end"]] for match in highlights]
+    result["highlights"] = highlights
+    if pacing is not None:
+        attach_pacing(result, pacing, compact)
+    return result
+
+def attach_pacing(result, pacing, compact=False):
+    """Adds a pacing summary to a result as "pacing", with its notes (see pacing.pacing_notes).
+
+    Compact results get the note ids (texts in feedback_catalog()["pacing"]); verbose results
+    get the texts, also appended to the Speech Rate feedback, whose score stays the bucket
+    score of the overall rate.
+    """
+    notes = pacing_notes(pacing)
+    if compact:
+        result["pacing"] = dict(pacing, notes=notes)
+        return result
+    texts = [PACING_NOTES[note] for note in notes]
+    result["pacing"] = dict(pacing, notes=texts)
+    entry = result["detailed_feedback"].get("Speech Rate", {}).get("Metrics", {}).get("Speech rate (WPM)")
+    if entry is not None:
+        entry["Feedback"] = " ".join([entry["Feedback"]] + texts)
+    return result
+
+def extract_raw_metrics(context, metrics=None):
+    """Runs each enabled metric's extractor over a TranscriptContext and merges their raw fields.
+
+    context may be any object with the same attributes (live sessions pass their running
+    state). word_count and duration_sec are always included, since every result reports them.
+    """
+    raw = {"word_count": context.word_count, "duration_sec": context.duration_sec}
+    for metric in ENABLED_METRICS if metrics is None else metrics:
+        raw.update(metric.extract(**{name: getattr(context, name) for name in metric.needs}))
+    return raw
+
+def has_estimates(result):
+    """True if any metric in an analyze_transcript result is a fallback estimate (e.g. a timed-out grammar check)."""
+    if "metrics" in result:
+        return bool(result.get("estimated"))
+    return any(entry.get("Estimated") for category in result["detailed_feedback"].values()
+               for entry in category["Metrics"].values())
+
+# (minimum total score, overall feedback), highest first
+OVERALL_FEEDBACK = [
+    (90, "Outstanding introduction! All criteria were met with high marks, demonstrating excellent preparation and delivery."),
+    (75, "Very strong performance. Good grasp of content, flow, and clarity. Review areas with scores below 10 for continuous improvement."),
+    (50, "Solid effort. The core content is present, but work on one or two specific areas (like WPM or Filler Rate) could significantly boost your score."),
+    (float("-inf"), "Needs improvement. Focus on ensuring all mandatory content points are covered and practicing your delivery for better pace and clarity.")
+]
+
+def score_raw_metrics(raw, bucket_scores=None, metrics=None, rubric=None, compact=False):
+    """Turns raw metric fields into the scored result (everything but highlights).
+
+    rubric is a CompiledRubric (default COMPILED_RUBRIC); raw fields stored earlier can be
+    re-scored against a changed rubric without re-analyzing the text. bucket_scores optionally
+    maps each ScoringBuckets metric name to an already looked-up (score, feedback), as the
+    vectorized batch engine does. compact=True returns the compact form instead (see
+    feedback_catalog): each metric as [score, numeric value, feedback id] and no feedback text.
+    """
+    rubric = COMPILED_RUBRIC if rubric is None else rubric
+    total_score = 0
+    detailed_scores = {}
+    compact_metrics, estimated = {}, []
+    for metric in ENABLED_METRICS if metrics is None else metrics:
+        if bucket_scores is None:
+            lookup = rubric.metrics[metric.name].lookup if metric.name in rubric.metrics else None
+        else:
+            lookup = lambda value, name=metric.name: bucket_scores[name]
+        spec = rubric.specs[metric.name]
+        value, score, feedback, number = metric.score(raw, spec, lookup)
+        is_estimate = metric.estimated_flag and raw.get(metric.estimated_flag)
+        total_score += score
+        if compact:
+            if metric.feedback:
+                feedback_id = metric.feedback.index(feedback)
+            else:
+                feedback_id = rubric.feedback_ids.get(metric.name, {}).get(feedback)
+            compact_metrics[metric.name] = [score, round(number, 4), feedback_id]
+            if is_estimate:
+                estimated.append(metric.name)
+            continue
+        category_scores = detailed_scores.setdefault(metric.category, {"TotalScore": 0, "Metrics": {}})
+        if is_estimate:
+            feedback += f" ({metric.estimated_note})"
+        category_scores["Metrics"][metric.name] = {"Value": value, "Score": score, "Feedback": feedback, "Weightage": spec["Weightage"]}
+        if is_estimate:
+            category_scores["Metrics"][metric.name]["Estimated"] = True
+        category_scores["TotalScore"] += score
+
+    overall_id = next(i for i, (minimum, _) in enumerate(OVERALL_FEEDBACK) if total_score >= minimum)
+    if compact:
+        result = {
+            "final_score": round(total_score, 0),
+            "total_word_count": raw["word_count"],
+            "total_duration_sec": raw["duration_sec"],
+            "metrics": compact_metrics,
+            "overall_feedback": overall_id
+        }
+        if "keyword_details" in raw:
+            result["missing_keywords"] = [label for label, found in raw["keyword_details"].items() if not found]
+        if estimated:
+            result["estimated"] = estimated
+        return result
+
+    return {
+        "final_score": round(total_score, 0),
+        "total_word_count": raw["word_count"],
+        "total_duration_sec": raw["duration_sec"],
+        "detailed_feedback": detailed_scores,
+        "overall_feedback": OVERALL_FEEDBACK[overall_id][1]
+    }
+
+def feedback_catalog(rubric=None):
+    """The feedback texts that compact results refer to by id, for the enabled metrics.
+
+    Bucket-scored metrics use the index of the bucket in the rubric's ScoringBuckets; rule-scored
+    ones the index in Metric.feedback (0 = rule not met). Key word Presence has no id, since
+    its feedback is built from missing_keywords.
+    """
+    rubric = COMPILED_RUBRIC if rubric is None else rubric
+    metrics = {}
+    for metric in ENABLED_METRICS:
+        if metric.feedback:
+            metrics[metric.name] = list(metric.feedback)
+        elif metric.name in rubric.feedback_ids:
+            metrics[metric.name] = list(rubric.feedback_ids[metric.name])
+    return {"metrics": metrics, "overall_feedback": [feedback for _, feedback in OVERALL_FEEDBACK], "pacing": list(PACING_NOTES)}
+
+# --- 4. BATCH SCORING ---
+
+BATCH_WORKERS = int(os.environ.get("SCORER_BATCH_WORKERS", os.cpu_count() or 1))
+BATCH_CHUNK_SIZE = int(os.environ.get("SCORER_BATCH_CHUNK_SIZE", 0)) # 0 = pick from batch size
+
+_batch_executors = {}
+_batch_executors_lock = threading.Lock()
+
+def normalize_transcript(transcript):
+    """Normalizes Unicode to NFC and line endings to \\n, so equivalent submissions score (and cache) identically."""
+    return unicodedata.normalize("NFC", transcript).replace("\r\n", "\n").replace("\r", "\n")
+
+def validate_score_input(transcript, duration_sec):
+    """Validates /score inputs and returns (transcript, duration_sec); raises ValueError with a user-facing message."""
+    if not transcript or not isinstance(transcript, str):
+        raise ValueError("Transcript text is required.")
+    try:
+        duration_sec = float(duration_sec)
+    except (TypeError, ValueError):
+        raise ValueError("Duration must be a valid number in seconds.")
+    if duration_sec <= 0:
+        duration_sec = 60
+    return normalize_transcript(transcript), duration_sec
+
+def validate_timed_input(data):
+    """Validates a /score body or batch item and returns (transcript, duration_sec, pacing summary or None).
+
+    With "words" (ASR word dicts with start/end times, in time order; may be a generator), the
+    pacing summary is computed from them in one pass. The transcript defaults to the words
+    joined by spaces, and the duration to the end of the last word. Otherwise this is
+    validate_score_input with no pacing. Raises ValueError with a user-facing message.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Transcript text is required.")
+    words = data.get('words')
+    if words is None:
+        return validate_score_input(data.get('transcript', ''), data.get('duration_sec', 0)) + (None,)
+    if isinstance(words, (str, bytes, dict)) or not hasattr(words, '__iter__'):
+        raise ValueError("Words must be an array of {word, start, end} objects.")
+    text, analyzer = read_timed_words(words)
+    pacing = analyzer.summary()
+    if pacing is None:
+        raise ValueError("At least one timed word is required.")
+    duration_sec = data.get('duration_sec') or analyzer.last_end
+    transcript, duration_sec = validate_score_input(data.get('transcript') or text, duration_sec)
+    return transcript, duration_sec, pacing
+
+def _score_batch_item(item, compact=False):
+    """Scores one batch item inside a worker, turning failures into an error entry."""
+    try:
+        transcript, duration_sec, pacing = validate_timed_input(item)
+    except ValueError as e:
+        return {"error": str(e)}
+    try:
+        return analyze_transcript(transcript, duration_sec, compact=compact, pacing=pacing)
+    except Exception as e:
+        return {"error": f"Internal server error: {str(e)}"}
+
+def _extract_batch_item(item):
+    """Like _score_batch_item, but returns the item's raw metric fields instead of its score (pacing is not a raw metric)."""
+    try:
+        transcript, duration_sec, _ = validate_timed_input(item)
+    except ValueError as e:
+        return {"error": str(e)}
+    try:
+        return extract_raw_metrics(TranscriptContext(transcript, duration_sec))
+    except Exception as e:
+        return {"error": f"Internal server error: {str(e)}"}
+
+def _get_batch_executor(workers):
+    """Returns the process pool for the given worker count, creating it on first use.
+
+    Workers are started by a forkserver (spawn where there is none), never forked from the
+    caller: in the threaded server another thread may hold a lock (a cache, session or grammar
+    pool lock) at the moment of the fork, and a forked child would inherit it held forever.
+    """
+    with _batch_executors_lock:
+        executor = _batch_executors.get(workers)
+        if executor is None:
+            # Imported here: concurrent.futures pulls in logging, which dominates import time
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            executor = _batch_executors[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return executor
+
+def batch_pool_workers():
+    """Total worker processes across the batch pools started so far in this process."""
+    with _batch_executors_lock:
+        return sum(_batch_executors)
+
+def score_batch(items, workers=None, chunk_size=None, raw=False, compact=False):
+    """Scores a list of {transcript, duration_sec} or {words, duration_sec?} items across a process pool.
+
+    Returns one result (or {"error": ...}) per item, in input order; with raw=True, each item's
+    raw metric fields (see extract_raw_metrics) instead, and with compact=True, compact results.
+    Items are sent to workers in chunks to amortize IPC; by default each worker receives about
+    four chunks.
+    """
+    if raw:
+        work = _extract_batch_item
+    else:
+        work = partial(_score_batch_item, compact=True) if compact else _score_batch_item
+    workers = workers or BATCH_WORKERS
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE or max(1, -(-len(items) // (workers * 4)))
+    if workers <= 1 or len(items) <= 1:
+        return [work(item) for item in items]
+    from concurrent.futures.process import BrokenProcessPool
+    executor = _get_batch_executor(workers)
+    try:
+        return list(executor.map(work, items, chunksize=chunk_size))
+    except BrokenProcessPool:
+        # A crashed worker poisons the pool; drop it so the next batch starts a fresh one
+        with _batch_executors_lock:
+            if _batch_executors.get(workers) is executor:
+                del _batch_executors[workers]
+        executor.shutdown(wait=False)
+        raise
+
+# --- 5. LIVE SESSIONS ---
+
+# Rough per-session and per-distinct-word memory cost, used for SessionStore's memory cap
+_SESSION_BASE_BYTES = 4096
+_SESSION_TYPE_BYTES = 80
+# Unpunctuated ASR text never completes a sentence, so the open one is checked and dropped at this
+# length; each append then costs O(chunk + this) instead of O(everything since the last full stop)
+SESSION_MAX_SENTENCE_CHARS = 2000
+
+class ScoringSession:
+    """A live transcript that is scored from each appended chunk instead of from the whole text.
+
+    Words are only counted once the whitespace after them has arrived, and phrases once the
+    text after them is long enough (see IncrementalPhraseScan), so words and phrases split
+    across chunks are counted exactly once. Grammar is checked as each sentence is completed,
+    or once the unfinished sentence passes SESSION_MAX_SENTENCE_CHARS (where the count can then
+    differ slightly from checking the whole text). Only the running counts, the set of distinct
+    words, a short tail of text and at most that much of the unfinished sentence are kept.
+    Callers serialize access through `lock` (SessionStore does).
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.phrases = IncrementalPhraseScan(PHRASE_MATCHER)
+        self.word_count = 0
+        self.types = set()
+        self.duration_sec = 0.0
+        self.approx_bytes = _SESSION_BASE_BYTES
+        self.last_access = time.monotonic()
+        self._pending = ""
+        self.grammar = IncrementalGrammarCheck(SESSION_MAX_SENTENCE_CHARS)
+        self.lock = threading.Lock()
+        self.accounted_bytes = self.approx_bytes # as counted in SessionStore's total
+
+    def append(self, text, elapsed_sec=None):
+        """Adds a chunk of transcript; elapsed_sec is the total speaking time so far."""
+        self.phrases.feed(text)
+        before = len(self.grammar.tail)
+        self.grammar.feed(text)
+        self.approx_bytes += len(self.grammar.tail) - before
+        text = self._pending + text
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        if cut:
+            words = safe_word_tokenize(text[:cut])
+            self.word_count += len(words)
+            for word in words:
+                if word not in self.types:
+                    self.types.add(word)
+                    self.approx_bytes += _SESSION_TYPE_BYTES + len(word)
+        self._pending = text[cut:]
+        if elapsed_sec is not None:
+            self.duration_sec = elapsed_sec
+
+    def score(self):
+        """Scores everything appended so far, as analyze_transcript would score the concatenated text (without highlights)."""
+        pending_words = safe_word_tokenize(self._pending) if self._pending else []
+        token_types = self.types
+        if any(word not in token_types for word in pending_words):
+            token_types = token_types | set(pending_words)
+        context = SimpleNamespace(word_count=self.word_count + len(pending_words), duration_sec=self.duration_sec,
+                                  token_types=token_types, phrase_scan=self.phrases.result(),
+                                  grammar_error_count=self.grammar.error_count())
+        result = score_raw_metrics(extract_raw_metrics(context))
+        result["session_id"] = self.session_id
+        return result
+
+class SessionStore:
+    """Live sessions with idle-TTL expiry and a total memory cap (least recently used evicted first).
+
+    The store lock only guards the session table and byte total; appending and scoring run under
+    each session's own lock, so a slow session does not hold up the others. A session lock may
+    be held while taking the store lock, never the other way round.
+    """
+
+    def __init__(self, ttl_sec=900, max_bytes=64 * 1024 * 1024):
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict() # session_id -> ScoringSession, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "expired": 0, "evicted": 0}
+
+    def create(self):
+        """Starts a new session and returns it."""
+        session = ScoringSession(os.urandom(16).hex())
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._bytes += session.accounted_bytes
+            self.stats["created"] += 1
+            self._evict()
+        return session
+
+    def append(self, session_id, text, elapsed_sec=None):
+        """Appends to a session and returns its current score, or None if it does not exist."""
+        with self._lock:
+            session = self._touch(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            session.append(text, elapsed_sec)
+            result = session.score()
+            with self._lock:
+                # Skipped if the session was deleted or evicted meanwhile (its bytes already left the total)
+                if self._sessions.get(session_id) is session:
+                    self._bytes += session.approx_bytes - session.accounted_bytes
+                    session.accounted_bytes = session.approx_bytes
+                    self._evict()
+        return result
+
+    def score(self, session_id):
+        """Returns a session's current score, or None if it does not exist."""
+        with self._lock:
+            session = self._touch(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            return session.score()
+
+    def delete(self, session_id):
+        """Ends a session; returns False if it did not exist."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self._bytes -= session.accounted_bytes
+            return True
+
+    def snapshot(self):
+        """Returns the counters plus the current session count and estimated memory."""
+        with self._lock:
+            self._evict()
+            return dict(self.stats, active=len(self._sessions), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def _touch(self, session_id):
+        # Caller holds the lock
+        self._evict()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self):
+        # Caller holds the lock
+        deadline = time.monotonic() - self.ttl_sec
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_access >= deadline and self._bytes <= self.max_bytes:
+                break
+            self._sessions.popitem(last=False)
+            self._bytes -= session.accounted_bytes
+            self.stats["expired" if session.last_access < deadline else "evicted"] += 1
@@ -0,0 +1,251 @@
+"""Bounded-memory scoring for transcripts too large to hold in memory (e.g. multi-hour lectures).
+
+analyze_stream() reads a transcript in chunks from a file, file object or iterable of strings
+and keeps only running counts, so memory does not grow with the length of the input:
+
+    python streaming.py lecture.txt --duration 5400
+    python streaming.py - --duration 5400 --ttr hll < lecture.txt
+    python streaming.py lecture.words.jsonl --words
+
+With --words the input is an ASR word stream, one {"word", "start", "end"} object per line
+(see pacing.py), and the result also has a pacing summary; the duration defaults to the end
+of the last word.
+
+Raw TTR keeps falling as a transcript gets longer and needs the set of every distinct word, so
+by default the vocabulary metric is scored with MATTR (the mean TTR over every window of
+MATTR_WINDOW consecutive words), which is length-independent and needs only the window.
+"hll" scores distinct words / words with distinct words estimated by a HyperLogLog sketch
+(fixed 2**precision bytes), and "exact" keeps the full set, matching analyze_transcript.
+
+Results match analyze_transcript except for the vocabulary metric (unless "exact"), missing
+highlights, and grammar on sentences longer than MAX_SENTENCE_CHARS, which are checked in pieces.
+"""
+import argparse
+import hashlib
+import json
+import math
+import sys
+from collections import deque
+from types import SimpleNamespace
+
+from pacing import PacingAnalyzer, parse_word, read_ndjson_words
+from scoring import (ENABLED_METRICS, PHRASE_MATCHER, IncrementalGrammarCheck, IncrementalPhraseScan, attach_pacing,
+                     extract_raw_metrics, normalize_transcript, safe_word_tokenize, score_raw_metrics)
+
+CHUNK_CHARS = 1024 * 1024
+CHUNK_WORDS = 50000
+MATTR_WINDOW = 100
+MAX_SENTENCE_CHARS = 64 * 1024
+TTR_METHODS = ("mattr", "hll", "exact")
+
+class MovingTTR:
+    """Moving-average type-token ratio (MATTR) over a fixed window of tokens.
+
+    Inputs shorter than the window get their plain TTR, so short transcripts score as before.
+    """
+
+    def __init__(self, window=MATTR_WINDOW):
+        self.window = window
+        self._tokens = deque()
+        self._counts = {}
+        self._distinct_sum = 0
+        self._windows = 0
+
+    def add(self, tokens):
+        window, counts, size = self._tokens, self._counts, self.window
+        tokens = iter(tokens)
+        # Filling the first window
+        while len(window) < size:
+            token = next(tokens, None)
+            if token is None:
+                return
+            window.append(token)
+            counts[token] = counts.get(token, 0) + 1
+            if len(window) == size:
+                self._distinct_sum += len(counts)
+                self._windows += 1
+        # Then every token slides the window by one
+        distinct_sum, windows = self._distinct_sum, self._windows
+        for token in tokens:
+            window.append(token)
+            old = window.popleft()
+            if old != token:
+                counts[token] = counts.get(token, 0) + 1
+                if counts[old] == 1:
+                    del counts[old]
+                else:
+                    counts[old] -= 1
+            distinct_sum += len(counts)
+            windows += 1
+        self._distinct_sum, self._windows = distinct_sum, windows
+
+    def value(self):
+        if self._windows:
+            return self._distinct_sum / (self._windows * self.window)
+        return len(self._counts) / len(self._tokens) if self._tokens else 0.0
+
+class HyperLogLog:
+    """Approximate distinct count in 2**precision bytes; standard error is about 1.04 / sqrt(2**precision)."""
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item):
+        x = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        index = x >> (64 - self.precision)
+        rank = (64 - self.precision) - (x & ((1 << (64 - self.precision)) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros) # linear counting for small cardinalities
+        return int(round(estimate))
+
+class StreamingAnalysis:
+    """Accumulates a transcript chunk by chunk; finish() returns the scored result."""
+
+    def __init__(self, ttr_method="mattr", mattr_window=MATTR_WINDOW, hll_precision=14, max_sentence_chars=MAX_SENTENCE_CHARS):
+        if ttr_method not in TTR_METHODS:
+            raise ValueError(f"Unknown TTR method: {ttr_method!r} (expected one of {', '.join(TTR_METHODS)}).")
+        self.ttr_method = ttr_method
+        self.phrases = IncrementalPhraseScan(PHRASE_MATCHER)
+        self.grammar = IncrementalGrammarCheck(max_sentence_chars)
+        self.mattr = MovingTTR(mattr_window)
+        self.types = set() if ttr_method == "exact" else None
+        self.sketch = HyperLogLog(hll_precision) if ttr_method == "hll" else None
+        self.word_count = 0
+        self._pending = ""
+
+    def feed(self, text):
+        """Adds the next chunk; words are counted once the whitespace after them has arrived."""
+        self.phrases.feed(text)
+        self.grammar.feed(text)
+        text = self._pending + text
+        cut = len(text)
+        while cut > 0 and not text[cut - 1].isspace():
+            cut -= 1
+        if cut:
+            self._count(safe_word_tokenize(text[:cut]))
+        self._pending = text[cut:]
+
+    def _count(self, words):
+        self.word_count += len(words)
+        self.mattr.add(words)
+        if self.types is not None:
+            self.types.update(words)
+        if self.sketch is not None:
+            for word in set(words):
+                self.sketch.add(word)
+
+    def finish(self, duration_sec):
+        """Scores everything fed so far; the result has a "vocabulary" summary and no highlights."""
+        if self._pending:
+            self._count(safe_word_tokenize(self._pending))
+            self._pending = ""
+        context = SimpleNamespace(word_count=self.word_count, duration_sec=duration_sec, phrase_scan=self.phrases.result(),
+                                  grammar_error_count=self.grammar.error_count(), token_types=self.types)
+        if self.types is not None:
+            raw = extract_raw_metrics(context)
+            distinct = len(self.types)
+        else:
+            raw = extract_raw_metrics(context, [metric for metric in ENABLED_METRICS if "token_types" not in metric.needs])
+            if self.sketch is not None:
+                distinct = self.sketch.count()
+                raw["ttr"] = min(distinct / self.word_count, 1.0) if self.word_count else 0.0
+            else:
+                distinct = None
+                raw["ttr"] = self.mattr.value()
+        result = score_raw_metrics(raw)
+        result["vocabulary"] = {
+            "ttr_method": self.ttr_method,
+            "mattr": self.mattr.value(),
+            "mattr_window": self.mattr.window,
+            "distinct_words": distinct
+        }
+        return result
+
+def iter_text_chunks(source, chunk_chars=CHUNK_CHARS):
+    """Yields normalized text chunks from a path, a text file object or an iterable of strings."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_text_chunks(f, chunk_chars)
+        return
+    if hasattr(source, "read"):
+        chunks = iter(lambda: source.read(chunk_chars), "")
+    else:
+        chunks = source
+    for chunk in chunks:
+        yield normalize_transcript(chunk)
+
+def analyze_stream(source, duration_sec, chunk_chars=CHUNK_CHARS, **options):
+    """Scores a transcript read in chunks from source (see iter_text_chunks) in bounded memory.
+
+    options are passed to StreamingAnalysis (ttr_method, mattr_window, hll_precision,
+    max_sentence_chars). A duration of 0 or less is treated as 60 seconds, as in /score.
+    """
+    analysis = StreamingAnalysis(**options)
+    for chunk in iter_text_chunks(source, chunk_chars):
+        analysis.feed(chunk)
+    return analysis.finish(duration_sec if duration_sec > 0 else 60)
+
+def analyze_word_stream(lines, duration_sec=None, chunk_words=CHUNK_WORDS, **options):
+    """Scores an NDJSON ASR word stream (see pacing.read_ndjson_words) in bounded memory, adding a pacing summary.
+
+    Words are fed to StreamingAnalysis chunk_words at a time while PacingAnalyzer sees each
+    one. duration_sec defaults to the header's duration_sec, else the end of the last word.
+    """
+    header, words = read_ndjson_words(lines)
+    analysis = StreamingAnalysis(**options)
+    pacing = PacingAnalyzer()
+    parts = []
+    for index, entry in enumerate(words):
+        text, start, end = parse_word(entry, index)
+        pacing.add(start, end)
+        parts.append(text)
+        if len(parts) >= chunk_words:
+            analysis.feed(normalize_transcript(" ".join(parts) + " "))
+            parts = []
+    analysis.feed(normalize_transcript(" ".join(parts)))
+    summary = pacing.summary()
+    if summary is None:
+        raise ValueError("At least one timed word is required.")
+    duration_sec = float(duration_sec or header.get("duration_sec") or pacing.last_end)
+    return attach_pacing(analysis.finish(duration_sec if duration_sec > 0 else 60), summary)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score one very large transcript file in bounded memory.")
+    parser.add_argument("input", help="UTF-8 text file (or NDJSON word file with --words), or '-' for stdin.")
+    parser.add_argument("--duration", type=float, help="Speaking time in seconds (required without --words).")
+    parser.add_argument("--words", action="store_true", help="Input is ASR words with timestamps, one JSON object per line.")
+    parser.add_argument("--ttr", choices=TTR_METHODS, default="mattr", help="Vocabulary metric (default: mattr).")
+    parser.add_argument("--mattr-window", type=int, default=MATTR_WINDOW)
+    parser.add_argument("--hll-precision", type=int, default=14)
+    parser.add_argument("--chunk-chars", type=int, default=CHUNK_CHARS)
+    args = parser.parse_args(argv)
+    if args.duration is None and not args.words:
+        parser.error("--duration is required unless the input is --words.")
+
+    source = sys.stdin if args.input == "-" else args.input
+    options = {"ttr_method": args.ttr, "mattr_window": args.mattr_window, "hll_precision": args.hll_precision}
+    if args.words:
+        stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        try:
+            result = analyze_word_stream(stream, args.duration, **options)
+        except ValueError as e:
+            sys.exit(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+    else:
+        result = analyze_stream(source, args.duration, chunk_chars=args.chunk_chars, **options)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
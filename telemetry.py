@@ -0,0 +1,133 @@
+"""Minimal Prometheus metrics: counters, histograms and callback gauges rendered in the text exposition format.
+
+Standard library only, so the scoring core and workers can import it cheaply. Metric values are
+updated under one lock per metric; callback gauges are evaluated only when /metrics is scraped.
+"""
+import threading
+from bisect import bisect_left
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Transcript size buckets, in words or bytes
+SIZE_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000, 1000000)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            if not self._values and not self.labelnames:
+                return [(self.name, (), 0)]
+            return [(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series = {} # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._series.items())]
+        samples = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", labels, cumulative, (("le", _format_value(bound)),)))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, cumulative))
+        return samples
+
+class CallbackGauge:
+    """Gauge (or counter) whose value is read from callback() at scrape time.
+
+    callback returns a number, or a list of (label values, number) when labelnames are given.
+    """
+
+    def __init__(self, name, help_text, callback, labelnames=(), kind="gauge"):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def samples(self):
+        value = self.callback()
+        if not self.labelnames:
+            return [(self.name, (), value)]
+        return [(self.name, tuple(labels), sample) for labels, sample in value]
+
+class MetricsRegistry:
+    """Holds metrics in registration order and renders them for Prometheus."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, buckets, labelnames=()):
+        return self.register(Histogram(name, help_text, buckets, labelnames))
+
+    def gauge(self, name, help_text, callback, labelnames=(), kind="gauge"):
+        return self.register(CallbackGauge(name, help_text, callback, labelnames, kind))
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in metric.samples():
+                name, labels, value = sample[:3]
+                extra = sample[3] if len(sample) > 3 else ()
+                lines.append(f"{name}{_format_labels(metric.labelnames, labels, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,136 @@
+"""Equivalence tests: CompiledBuckets lookups vs. the original per-call range parsing.
+
+legacy_get_score_and_feedback is get_score_and_feedback as it was before the rubric was
+compiled. Outside the gaps that display-precision ranges leave between neighbouring buckets,
+both must agree on every value; inside a gap the legacy code fell through to the last bucket,
+while CompiledBuckets assigns the gap to the bucket below it. That behaviour is pinned here.
+
+Run with: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import COMPILED_RUBRIC, RUBRIC, CompiledBuckets
+
+def legacy_get_score_and_feedback(metric_value, scoring_buckets, is_filler_rate=False):
+    """The pre-compilation lookup, kept verbatim apart from the bare except."""
+    best_match = None
+    if is_filler_rate:
+        for bucket in scoring_buckets:
+            range_str = bucket["Range"].replace("%", "").strip()
+            if range_str.startswith('<'):
+                threshold = float(range_str.split('<')[1].strip())
+                if metric_value < threshold:
+                    best_match = bucket
+                    break
+            elif range_str.startswith('>'):
+                threshold = float(range_str.split('>')[1].strip())
+                if metric_value > threshold:
+                    best_match = bucket
+                    break
+            else:
+                low, high = map(float, [r.strip() for r in range_str.split('-')])
+                if low <= metric_value <= high:
+                    best_match = bucket
+                    break
+    else:
+        for bucket in scoring_buckets:
+            range_str = bucket["Range"].strip()
+            if "WPM" in range_str:
+                wpm = metric_value
+                if '111 - 140' in range_str and 111 <= wpm <= 140:
+                    best_match = bucket
+                    break
+                elif range_str.startswith('>') and wpm > 140:
+                    best_match = bucket
+                    break
+                elif '81 - 110' in range_str and 81 <= wpm <= 110:
+                    best_match = bucket
+                    break
+                elif range_str.startswith('<') and wpm < 80:
+                    best_match = bucket
+                    break
+            else:
+                range_str = range_str.replace('–', 'to').strip()
+                if range_str.startswith('>'):
+                    threshold = float(range_str.split('>')[1].strip())
+                    if metric_value > threshold:
+                        best_match = bucket
+                        break
+                elif range_str.startswith('<'):
+                    threshold = float(range_str.split('<')[1].strip())
+                    if metric_value < threshold:
+                        best_match = bucket
+                        break
+                else:
+                    try:
+                        low, high = map(float, [r.strip() for r in range_str.split('to')])
+                        if low <= metric_value <= high:
+                            best_match = bucket
+                            break
+                    except ValueError:
+                        best_match = scoring_buckets[-1]
+    if best_match is None:
+        return scoring_buckets[-1]["Score"], scoring_buckets[-1]["Feedback"]
+    return best_match["Score"], best_match["Feedback"]
+
+def buckets(metric_name):
+    for category in RUBRIC.values():
+        if metric_name in category["Metrics"]:
+            return category["Metrics"][metric_name]["ScoringBuckets"]
+    raise KeyError(metric_name)
+
+# metric -> (values to compare, gap bands as (low, high): values with low < v <= high are in a gap)
+METRICS = {
+    "Speech rate (WPM)": ([i / 10 for i in range(0, 3001)], [(110, 111)]),
+    "Grammar errors (Score)": ([i / 1000 for i in range(0, 1001)], [(0.49, 0.5), (0.69, 0.7), (0.89, 0.9)]),
+    "Vocabulary richness (TTR)": ([i / 1000 for i in range(0, 1001)], [(0.29, 0.3), (0.49, 0.5), (0.69, 0.7), (0.89, 0.9)]),
+    "Filler Word Rate": ([i / 100 for i in range(0, 1001)], [(1.9, 2.0), (2.9, 3.0), (3.9, 4.0), (4.9, 5.0)]),
+}
+
+@pytest.mark.parametrize("metric_name", sorted(METRICS))
+def test_matches_legacy_outside_gaps(metric_name):
+    values, gaps = METRICS[metric_name]
+    compiled = COMPILED_RUBRIC.metrics[metric_name]
+    is_filler_rate = metric_name == "Filler Word Rate"
+    checked = 0
+    for value in values:
+        if any(low < value <= high for low, high in gaps):
+            continue
+        assert compiled.lookup(value) == legacy_get_score_and_feedback(value, buckets(metric_name), is_filler_rate), value
+        checked += 1
+    assert checked > len(values) // 2
+
+@pytest.mark.parametrize("metric_name, value, score", [
+    # Gaps go to the bucket below instead of falling through to the last bucket
+    ("Speech rate (WPM)", 110.5, 6),
+    ("Speech rate (WPM)", 110.99, 6),
+    ("Speech rate (WPM)", 111, 10),
+    ("Grammar errors (Score)", 0.495, 4),
+    ("Grammar errors (Score)", 0.5, 6),
+    ("Grammar errors (Score)", 0.895, 8),
+    ("Grammar errors (Score)", 0.9, 8), # "> 0.9" excludes 0.9 itself
+    ("Grammar errors (Score)", 0.901, 10),
+    ("Vocabulary richness (TTR)", 0.495, 4),
+    ("Vocabulary richness (TTR)", 0.895, 8),
+    ("Vocabulary richness (TTR)", 0.9, 10),
+    ("Filler Word Rate", 1.95, 25),
+    ("Filler Word Rate", 2.0, 20),
+    ("Filler Word Rate", 4.95, 10),
+    ("Filler Word Rate", 5.0, 10), # "> 5.0%" excludes 5.0 itself
+    ("Filler Word Rate", 5.01, 5),
+])
+def test_gap_values_go_to_the_bucket_below(metric_name, value, score):
+    assert COMPILED_RUBRIC.metrics[metric_name].lookup(value)[0] == score
+
+def test_values_outside_every_bucket_fall_back_to_the_last_bucket():
+    ttr = buckets("Vocabulary richness (TTR)")
+    assert COMPILED_RUBRIC.metrics["Vocabulary richness (TTR)"].lookup(1.5) == (ttr[-1]["Score"], ttr[-1]["Feedback"])
+
+def test_overlapping_buckets_are_rejected():
+    with pytest.raises(ValueError):
+        CompiledBuckets([{"Range": "0 - 10", "Score": 1, "Feedback": "a"}, {"Range": "5 - 20", "Score": 2, "Feedback": "b"}])
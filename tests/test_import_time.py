@@ -0,0 +1,33 @@
+"""Import-time regression checks: the budget and forbidden imports from benchmarks/bench_import_time.py.
+
+Each check runs in a fresh interpreter. The budget here is deliberately generous (set
+SCORER_IMPORT_BUDGET_MS to tighten it) so that a loaded CI machine does not fail the suite; it
+still catches a heavy import such as Flask or NLTK creeping into a module's top level.
+
+Run with: python -m pytest tests
+"""
+import os
+import statistics
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bench_import_time import FORBIDDEN, import_time_us, loaded_forbidden
+
+BUDGET_MS = float(os.environ.get("SCORER_IMPORT_BUDGET_MS", 250))
+
+@pytest.mark.parametrize("module", sorted(FORBIDDEN))
+def test_import_loads_no_forbidden_modules(module):
+    assert loaded_forbidden(module) == []
+
+def test_scoring_does_not_load_flask_or_nltk():
+    # Spelled out so that trimming FORBIDDEN cannot silently drop the check
+    assert {"flask", "nltk"} <= set(FORBIDDEN["scoring"])
+
+@pytest.mark.parametrize("module", sorted(FORBIDDEN))
+def test_import_time_within_budget(module):
+    import_time_us(module) # write the .pyc files first
+    median_ms = statistics.median(import_time_us(module) for _ in range(3)) / 1000
+    assert median_ms <= BUDGET_MS, f"import {module} took {median_ms:.1f} ms (budget {BUDGET_MS:.0f} ms)"